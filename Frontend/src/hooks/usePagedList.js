@@ -0,0 +1,32 @@
+import { useMemo } from 'react';
+import { useInfiniteQuery } from '@tanstack/react-query';
+
+/**
+ * Постраничный список API (limit, cursor -> {items, next})
+ *
+ * Загружается только первая страница; следующая - по loadMore() (кнопка "Показать ещё").
+ * @param {Array} queryKey - ключ запроса, как для useQuery (['/api/clans'])
+ * @param {Object} options - опции useInfiniteQuery (enabled, staleTime, ...)
+ * @returns {Object} - {items, hasMore, loadMore, isLoadingMore, ...результат useInfiniteQuery}
+ */
+export function usePagedList(queryKey, options = {}) {
+  const query = useInfiniteQuery({
+    queryKey,
+    initialPageParam: null,
+    getNextPageParam: (lastPage) => lastPage?.next || undefined,
+    ...options,
+  });
+
+  const items = useMemo(
+    () => query.data?.pages.flatMap((page) => page?.items || []) || [],
+    [query.data]
+  );
+
+  return {
+    ...query,
+    items,
+    hasMore: Boolean(query.hasNextPage),
+    loadMore: () => query.fetchNextPage(),
+    isLoadingMore: query.isFetchingNextPage,
+  };
+}
@@ -54,9 +54,12 @@ export async function apiRequest(
   return responseData;
 }
 
+// Служебные поля постраничных списков ({items: [...], limit, next})
+const PAGE_KEYS = ['limit', 'next'];
+
 export const getQueryFn =
   ({ on401: unauthorizedBehavior }) =>
-  async ({ queryKey }) => {
+  async ({ queryKey, pageParam }) => {
     const headers = {};
     
     // Добавляем Authorization токен из localStorage
@@ -65,7 +68,13 @@ export const getQueryFn =
       headers['Authorization'] = `Bearer ${accessToken}`;
     }
     
-    const res = await fetch(queryKey.join("/"), {
+    // pageParam - курсор следующей страницы (useInfiniteQuery, см. usePagedList)
+    let url = queryKey.join("/");
+    if (pageParam) {
+      url += `${url.includes('?') ? '&' : '?'}cursor=${encodeURIComponent(pageParam)}`;
+    }
+    
+    const res = await fetch(url, {
       headers,
       credentials: "include",
     });
@@ -82,6 +91,12 @@ export const getQueryFn =
     if (data && typeof data === 'object' && data.success === true) {
       // Удаляем success из результата и возвращаем остальное
       const { success, ...rest } = data;
+      // Страница списка ({clans: [...], limit, next}) -> {items, next}; следующие страницы
+      // запрашиваются только по действию пользователя (usePagedList -> fetchNextPage)
+      const listKeys = Object.keys(rest).filter((key) => !PAGE_KEYS.includes(key));
+      if ('next' in rest && listKeys.length === 1) {
+        return { items: rest[listKeys[0]], next: rest.next };
+      }
       // Если остался только один ключ (например {clan: {...}}), возвращаем его значение
       const keys = Object.keys(rest);
       if (keys.length === 1) {
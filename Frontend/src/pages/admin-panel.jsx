@@ -11,7 +11,7 @@ import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, Di
 import { useToast } from '@/hooks/use-toast';
 import { Shield, Users, Crown, Edit, Trash2 } from 'lucide-react';
 import { apiRequest, queryClient } from '@/lib/queryClient';
-import { useQuery } from '@tanstack/react-query';
+import { usePagedList } from '@/hooks/usePagedList';
 
 export default function AdminPanel() {
   const { isAdmin, loading, user } = useAuth();
@@ -46,9 +46,13 @@ export default function AdminPanel() {
     requirements: {}
   });
   
-  // Загрузка списка кланов с детальной информацией для админов
-  const { data: clans = [] } = useQuery({
-    queryKey: ['/api/admin/clans'],
+  // Загрузка списка кланов с детальной информацией для админов (страницами)
+  const {
+    items: clans,
+    hasMore: hasMoreClans,
+    loadMore: loadMoreClans,
+    isLoadingMore: loadingMoreClans
+  } = usePagedList(['/api/admin/clans'], {
     enabled: !loading && isAdmin
   });
   
@@ -441,6 +445,17 @@ export default function AdminPanel() {
                     </div>
                   </div>
                 ))}
+                {hasMoreClans && (
+                  <Button
+                    variant="outline"
+                    className="w-full"
+                    data-testid="button-load-more-clans"
+                    disabled={loadingMoreClans}
+                    onClick={loadMoreClans}
+                  >
+                    {loadingMoreClans ? 'Загрузка...' : 'Показать ещё'}
+                  </Button>
+                )}
               </div>
             )}
           </CardContent>
@@ -20,6 +20,7 @@ import { useState, useRef, useEffect, useMemo } from "react";
 
 // Squad Stats Components
 import { useSquadStats } from "@/hooks/useSquadStats";
+import { usePagedList } from "@/hooks/usePagedList";
 import { useAuth } from "@/contexts/AuthContext";
 import { useToast } from "@/hooks/use-toast";
 import { useQuery, useMutation } from "@tanstack/react-query";
@@ -381,15 +382,17 @@ export default function ProfilePage() {
   const { toast } = useToast();
   const [userRole, setUserRole] = useState("guest"); // Default to guest for demo
   const [selectedClan, setSelectedClan] = useState(null);
-  // Загружаем список кланов из API для гостевых пользователей
-  const { data: clansData = [] } = useQuery({
-    queryKey: ['/api/clans'],
+  // Загружаем список кланов из API для гостевых пользователей (страницами, "Показать ещё")
+  const {
+    items: clans,
+    hasMore: hasMoreClans,
+    loadMore: loadMoreClans,
+    isLoadingMore: loadingMoreClans
+  } = usePagedList(['/api/clans'], {
     enabled: userRole === 'guest', // Загружать только для гостей
     staleTime: 2 * 60 * 1000,
   });
   
-  const clans = clansData;
-  
   // Мемоизированное состояние Discord кнопки для GUEST view
   const selectedClanData = useMemo(() => 
     clans?.find(c => c.id === selectedClan), 
@@ -602,14 +605,18 @@ export default function ProfilePage() {
   // Поэтому user это сам объект player с полем id
   const isOwner = clanData?.ownerId === user?.id;
   
-  const { data: applicationsResponse, isLoading: applicationsLoading } = useQuery({
-    queryKey: ['/api/clans', currentClanId, 'applications'],
+  // Заявки загружаются страницами: следующая - по кнопке "Показать ещё"
+  const {
+    items: applicationItems,
+    isLoading: applicationsLoading,
+    hasMore: hasMoreApplications,
+    loadMore: loadMoreApplications,
+    isLoadingMore: loadingMoreApplications
+  } = usePagedList(['/api/clans', currentClanId, 'applications'], {
     enabled: !!currentClanId && isOwner,
   });
   
-  // queryClient автоматически распаковывает {success: true, applications: [...]} -> [...]
-  // Поэтому applicationsResponse это УЖЕ массив заявок!
-  const applications = (applicationsResponse || []).map(app => ({
+  const applications = applicationItems.map(app => ({
     id: app.id,
     name: app.player?.username || 'Unknown',
     avatar: app.player?.username?.substring(0, 2).toUpperCase() || 'UN',
@@ -1550,7 +1557,7 @@ export default function ProfilePage() {
                       >
                         <span className="relative z-10">ЗАЯВКИ</span>
                         {applications.length > 0 && (
-                          <Badge className="bg-primary text-black h-4 px-1 text-[10px] animate-pulse relative z-10">{applications.length}</Badge>
+                          <Badge className="bg-primary text-black h-4 px-1 text-[10px] animate-pulse relative z-10">{applications.length}{hasMoreApplications ? '+' : ''}</Badge>
                         )}
                         <div className={`absolute bottom-0 left-0 right-0 h-0.5 bg-gradient-to-r from-transparent via-primary to-transparent transition-all duration-300 ${ownerTab === "applications" ? "opacity-100 scale-x-100" : "opacity-0 scale-x-50"}`} />
                         <div className={`absolute bottom-0 left-0 right-0 h-1 bg-primary rounded-t-full transition-all duration-300 shadow-[0_-2px_20px_rgba(255,102,0,0.5)] ${ownerTab === "applications" ? "opacity-100" : "opacity-0"}`} />
@@ -1588,7 +1595,7 @@ export default function ProfilePage() {
                                 <Search className="w-4 h-4" />
                                 Выберите Клан для вступления
                              </Label>
-                             <span className="text-xs text-muted-foreground bg-zinc-900 px-2 py-1 rounded border border-white/5">{clans.length} доступно</span>
+                             <span className="text-xs text-muted-foreground bg-zinc-900 px-2 py-1 rounded border border-white/5">{clans.length}{hasMoreClans ? '+' : ''} доступно</span>
                           </div>
 
                           <div className="max-h-[500px] overflow-y-auto pr-2 scrollbar-thin scrollbar-thumb-white/10 scrollbar-track-transparent hover:scrollbar-thumb-white/20">
@@ -1657,6 +1664,16 @@ export default function ProfilePage() {
                                 );
                              })}
                             </div>
+                            {hasMoreClans && (
+                              <Button
+                                variant="outline"
+                                className="w-full mt-6 border-white/10"
+                                disabled={loadingMoreClans}
+                                onClick={loadMoreClans}
+                              >
+                                {loadingMoreClans ? <Loader2 className="w-4 h-4 animate-spin" /> : 'Показать ещё'}
+                              </Button>
+                            )}
                           </div>
                        </div>
 
@@ -2066,7 +2083,7 @@ export default function ProfilePage() {
                       <h3 className="text-xl font-display font-bold text-white flex items-center gap-3 mb-6">
                         <Users className="w-6 h-6 text-primary" />
                         Заявки на вступление
-                        <Badge variant="outline" className="border-white/10 bg-white/5 ml-auto font-mono">Всего: {applications.length}</Badge>
+                        <Badge variant="outline" className="border-white/10 bg-white/5 ml-auto font-mono">Всего: {applications.length}{hasMoreApplications ? '+' : ''}</Badge>
                       </h3>
 
                       {applications.length === 0 ? (
@@ -2133,6 +2150,16 @@ export default function ProfilePage() {
                               </div>
                             </div>
                           ))}
+                          {hasMoreApplications && (
+                            <Button
+                              variant="outline"
+                              className="w-full border-white/10"
+                              disabled={loadingMoreApplications}
+                              onClick={loadMoreApplications}
+                            >
+                              {loadingMoreApplications ? <Loader2 className="w-4 h-4 animate-spin" /> : 'Показать ещё'}
+                            </Button>
+                          )}
                         </div>
                       )}
                     </motion.div>
@@ -23,9 +23,50 @@ def create_app(config_name=None):
              "supports_credentials": True
          }})
     
-    # Инициализация MongoDB - ОТКЛЮЧЕНО (используем только PostgreSQL)
-    # from services.mongo_service import init_mongo
-    # init_mongo(app)
+    # MongoDB (статистика SquadJS): клиент создаётся лениво в каждом воркере,
+    # при недоступности circuit breaker отдаёт ошибку сразу
+    from services.mongo_service import init_mongo, mongo_status
+    init_mongo(app)
+    
+    # Кэш статистики игроков
+    from services.cache_service import init_stats_cache
+    init_stats_cache(app)
+    
+    # Кэш конфигурации рангов (ETag / 304)
+    from services.rank_service import init_rank_config
+    init_rank_config(app)
+    
+    # Таблица лидеров (фоновый поток стартует лениво в каждом воркере)
+    from services.leaderboard_service import init_leaderboard
+    init_leaderboard(app)
+    
+    # Поиск игроков по имени (player_names + pg_trgm, синхронизация после пересборки таблицы лидеров)
+    from services.search_service import init_search
+    init_search(app)
+    
+    # Перцентили игроков (массивы пересобираются вместе с таблицей лидеров)
+    from services.percentile_service import init_percentiles
+    init_percentiles(app)
+    
+    # Снимки статистики участников кланов и заявителей (фоновый поток воркера)
+    from services.snapshot_service import init_stats_snapshots
+    init_stats_snapshots(app)
+    
+    # История статистики игроков (снятие дельт раз в STATS_HISTORY_INTERVAL)
+    from services.history_service import init_stats_history
+    init_stats_history(app)
+    
+    # Онлайн-статусы участников кланов (опрос Steam API раз в STEAM_PRESENCE_INTERVAL)
+    from services.presence_service import init_steam_presence
+    init_steam_presence(app)
+    
+    # Счётчик SQL-запросов (X-Query-Count в режиме отладки)
+    from services.query_counter import init_query_counter
+    init_query_counter(app)
+    
+    # Сжатие JSON-ответов всех blueprints (gzip / brotli)
+    from services.compression_service import init_compression
+    init_compression(app)
     
     # Регистрация blueprints
     from routes import api
@@ -38,6 +79,10 @@ def create_app(config_name=None):
     app.register_blueprint(uploads.bp)
     app.register_blueprint(players.bp)
     
+    # CLI: flask repair-clan-summary
+    from services.clan_service import init_clan_commands
+    init_clan_commands(app)
+    
     # Создание таблиц БД (PostgreSQL)
     with app.app_context():
         db.create_all()
@@ -54,7 +99,7 @@ def create_app(config_name=None):
     # Health check
     @app.route('/health')
     def health():
-        return jsonify({'status': 'healthy'}), 200
+        return jsonify({'status': 'healthy', 'mongo': mongo_status()}), 200
     
     # Раздача статических файлов (загруженные изображения)
     # Используем /api/static/uploads/ чтобы автоматически проксировалось через Vite
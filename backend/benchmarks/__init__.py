@@ -0,0 +1 @@
+# Микро-бенчмарки горячих путей статистики (запуск: python -m benchmarks.<module>)
@@ -0,0 +1,53 @@
+"""
+Сохранение и сравнение результатов бенчмарков
+
+Baseline - JSON с параметрами запуска и временем каждого бенчмарка (мкс на вызов).
+Файл зависит от машины, поэтому не коммитится (см. .gitignore).
+"""
+import json
+import os
+import platform
+import time
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def save_baseline(results, params, path=DEFAULT_BASELINE_PATH):
+    """Записать результаты как baseline"""
+    data = {
+        'createdAt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'params': params,
+        'results': results
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def load_baseline(path=DEFAULT_BASELINE_PATH):
+    """Прочитать baseline или None, если файла нет"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(results, baseline, threshold=0.2):
+    """
+    Сравнить результаты с baseline
+    
+    Args:
+        threshold: допустимое замедление (0.2 = +20%)
+    
+    Returns:
+        list: (name, baseline µs, current µs, отношение, регрессия?) для общих бенчмарков
+    """
+    rows = []
+    for name, current in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        ratio = current / previous if previous else float('inf')
+        rows.append((name, previous, current, ratio, ratio > 1 + threshold))
+    return rows
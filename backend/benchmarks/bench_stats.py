@@ -0,0 +1,167 @@
+"""
+Бенчмарки горячих путей статистики игрока
+
+Функции stats_service и полный обработчик GET /api/stats/<steam_id> на
+синтетических документах mainstats (benchmarks.synthetic) и коллекции в памяти
+(benchmarks.memory_mongo). Время - мкс на один документ / запрос, минимум из
+--repeat прогонов.
+
+Запуск из папки backend:
+    python -m benchmarks.bench_stats [--players 200] [--weapons 300] [--repeat 5]
+    python -m benchmarks.bench_stats --save-baseline      # записать benchmarks/baseline.json
+    python -m benchmarks.bench_stats --compare            # сравнить с baseline (exit 1 при регрессии)
+"""
+import argparse
+import sys
+import time
+import timeit
+
+from flask import Flask
+
+from benchmarks.baseline import DEFAULT_BASELINE_PATH, compare_results, load_baseline, save_baseline
+from benchmarks.memory_mongo import MemoryCollection
+from benchmarks.synthetic import generate_mainstats
+from services.cache_service import stats_cache
+from services.leaderboard_service import LeaderboardSnapshot
+from services.percentile_service import player_percentiles
+from services.stats_service import (
+    calc_vehicle_kills,
+    calc_vehicle_time,
+    calculate_kd_ratio,
+    categorize_weapons,
+    decode_player_stats,
+    get_user_high_score_and_group,
+    win_rate
+)
+
+
+def build_leaderboard_snapshot(documents):
+    """Снимок таблицы лидеров из документов (для перцентилей в ответе обработчика)"""
+    records = [decode_player_stats(document) for document in documents]
+    columns = {
+        'kills': [record.kills for record in records],
+        'deaths': [record.deaths for record in records],
+        'kd': [calculate_kd_ratio(record.kills, record.deaths) for record in records],
+        'winRate': [win_rate(record.wins, record.matches) for record in records],
+        'revives': [record.revives for record in records],
+        'playtime': [record.time or 0 for record in records],
+        'matches': [record.matches for record in records],
+        'wins': [record.wins for record in records],
+        'score': [record.rank[1] if record.rank else 0 for record in records],
+        'scoreGroup': [record.rank[0] if record.rank else None for record in records]
+    }
+    return LeaderboardSnapshot(
+        [record.steam_id for record in records],
+        [record.player_name for record in records],
+        columns,
+        time.time()
+    )
+
+
+def create_bench_app(collection):
+    """Минимальное приложение с blueprint api; mainstats читается из памяти"""
+    import routes.stats
+    from routes import api
+    
+    routes.stats.get_collection = lambda name: collection
+    app = Flask(__name__)
+    app.register_blueprint(api)
+    return app
+
+
+def measure(func, items, repeat):
+    """Минимальное время func(item) по всем items, мкс на элемент"""
+    def run():
+        for item in items:
+            func(item)
+    return min(timeit.repeat(run, number=1, repeat=repeat)) * 1e6 / len(items)
+
+
+def run_benchmarks(documents, repeat):
+    """
+    Returns:
+        dict: имя бенчмарка -> мкс на вызов
+    """
+    results = {}
+    
+    results['calc_vehicle_time'] = measure(lambda d: calc_vehicle_time(d['possess']), documents, repeat)
+    calc_vehicle_kills(documents[0]['weapons'])  # классификатор оружия с прогретым кэшем
+    results['calc_vehicle_kills'] = measure(lambda d: calc_vehicle_kills(d['weapons']), documents, repeat)
+    results['categorize_weapons'] = measure(lambda d: categorize_weapons(d['weapons']), documents, repeat)
+    results['get_user_high_score_and_group'] = measure(get_user_high_score_and_group, documents, repeat)
+    results['decode_player_stats'] = measure(lambda d: decode_player_stats(d).to_dict(), documents, repeat)
+    
+    collection = MemoryCollection(documents)
+    player_percentiles.rebuild(build_leaderboard_snapshot(documents))
+    client = create_bench_app(collection).test_client()
+    steam_ids = [document['_id'] for document in documents]
+    
+    def request_stats(url):
+        response = client.get(url)
+        assert response.status_code == 200 and 'warning' not in response.get_json(), response.get_json()
+    
+    stats_cache.configure(ttl=0)  # каждый запрос - чтение документа и полный расчёт
+    results['get_player_stats'] = measure(request_stats, [f'/api/stats/{i}' for i in steam_ids], repeat)
+    results['get_player_stats?fields=summary'] = measure(
+        request_stats, [f'/api/stats/{i}?fields=summary' for i in steam_ids], repeat
+    )
+    
+    stats_cache.configure(ttl=3600, max_entries=len(steam_ids) * 2)
+    urls = [f'/api/stats/{i}' for i in steam_ids]
+    for url in urls:
+        request_stats(url)
+    results['get_player_stats (cached)'] = measure(request_stats, urls, repeat)
+    
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=200)
+    parser.add_argument('--weapons', type=int, default=300, help='ключей weapons у ветерана')
+    parser.add_argument('--possess', type=int, default=40, help='ключей possess у ветерана')
+    parser.add_argument('--roles', type=int, default=30, help='ключей roles у ветерана')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE_PATH, metavar='PATH')
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE_PATH, metavar='PATH')
+    parser.add_argument('--threshold', type=float, default=0.2, help='допустимое замедление (0.2 = +20%%)')
+    args = parser.parse_args()
+    
+    params = {
+        'players': args.players, 'weapons': args.weapons, 'possess': args.possess,
+        'roles': args.roles, 'seed': args.seed
+    }
+    documents = generate_mainstats(
+        args.players, args.seed, weapon_keys=args.weapons, possess_keys=args.possess, role_keys=args.roles
+    )
+    results = run_benchmarks(documents, args.repeat)
+    
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        if baseline is None:
+            print(f"Baseline not found: {args.compare}")
+            return 2
+        if baseline['params'] != params:
+            print(f"Warning: baseline params differ: {baseline['params']}")
+        
+        rows = compare_results(results, baseline, args.threshold)
+        print(f"{'benchmark':<34} {'baseline, µs':>13} {'current, µs':>12} {'ratio':>7}")
+        for name, previous, current, ratio, regressed in rows:
+            mark = '  REGRESSION' if regressed else ''
+            print(f"{name:<34} {previous:>13.1f} {current:>12.1f} {ratio:>6.2f}x{mark}")
+        if any(row[4] for row in rows):
+            return 1
+    else:
+        print(f"{'benchmark':<34} {'µs':>10}")
+        for name, value in results.items():
+            print(f"{name:<34} {value:>10.1f}")
+    
+    if args.save_baseline:
+        save_baseline(results, params, args.save_baseline)
+        print(f"Baseline saved: {args.save_baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Микро-бенчмарк классификатора оружия
+
+Сравнивает прежний calc_vehicle_kills (скан каждого шаблона по всем ключам)
+с текущим (скомпилированный regex + кэш классификации по ключу)
+на больших словарях weapons, похожих на документы ветеранов.
+
+Запуск из папки backend:
+    python -m benchmarks.bench_weapon_classifier [--keys 600] [--repeat 200]
+"""
+import argparse
+import random
+import timeit
+
+from benchmarks.synthetic import make_weapons
+from services.stats_service import HEAVY_VEHICLE_WEAPONS, calc_vehicle_kills, classify_weapon
+
+
+def legacy_calc_vehicle_kills(weapons):
+    """Прежняя реализация: O(шаблоны x ключи)"""
+    total_kills = 0
+    for vehicle_weapon in HEAVY_VEHICLE_WEAPONS:
+        matching_weapons = [key for key in weapons.keys() if vehicle_weapon in key]
+        for weapon_key in matching_weapons:
+            total_kills += weapons[weapon_key]
+    return total_kills
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--keys', type=int, nargs='+', default=[100, 300, 600, 1200])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    print(f"{'keys':>6} {'legacy, µs':>12} {'cold, µs':>10} {'warm, µs':>10} {'speedup':>8}")
+    
+    for size in args.keys:
+        weapons = make_weapons(rng, size)
+        assert calc_vehicle_kills(weapons) == legacy_calc_vehicle_kills(weapons)
+        
+        legacy = min(timeit.repeat(lambda: legacy_calc_vehicle_kills(weapons), number=args.repeat, repeat=3))
+        
+        # Холодный кэш: первый просмотр профиля после рестарта воркера
+        def cold():
+            classify_weapon.cache_clear()
+            calc_vehicle_kills(weapons)
+        cold_time = min(timeit.repeat(cold, number=args.repeat, repeat=3))
+        
+        warm = min(timeit.repeat(lambda: calc_vehicle_kills(weapons), number=args.repeat, repeat=3))
+        
+        per_call = 1e6 / args.repeat
+        print(f"{size:>6} {legacy * per_call:>12.1f} {cold_time * per_call:>10.1f} "
+              f"{warm * per_call:>10.1f} {legacy / warm:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Коллекция MongoDB в памяти для бенчмарков
+
+Поддерживает только то, что нужно путям статистики: фильтр по _id
+(значение или $in) и inclusion-projection. Сеть и декодирование BSON
+не моделируются - измеряется Python-часть обработки.
+"""
+
+
+class MemoryCursor:
+    def __init__(self, documents):
+        self._documents = documents
+        self._limit = 0
+    
+    def limit(self, count):
+        self._limit = count
+        return self
+    
+    def max_time_ms(self, ms):
+        return self
+    
+    def batch_size(self, size):
+        return self
+    
+    def __iter__(self):
+        documents = self._documents[:self._limit] if self._limit else self._documents
+        return iter(documents)
+
+
+class MemoryCollection:
+    """Коллекция документов, индексированная по _id"""
+    
+    def __init__(self, documents=()):
+        self._documents = {document['_id']: document for document in documents}
+        self.queries = 0
+    
+    def __len__(self):
+        return len(self._documents)
+    
+    @staticmethod
+    def _project(document, projection):
+        if not projection:
+            return dict(document)
+        result = {'_id': document['_id']}
+        for field, include in projection.items():
+            if include and field in document:
+                result[field] = document[field]
+        return result
+    
+    def _match(self, query):
+        steam_id = (query or {}).get('_id')
+        if steam_id is None:
+            return list(self._documents.values())
+        if isinstance(steam_id, dict):
+            return [self._documents[key] for key in steam_id.get('$in', ()) if key in self._documents]
+        document = self._documents.get(steam_id)
+        return [document] if document is not None else []
+    
+    def find_one(self, query=None, projection=None):
+        self.queries += 1
+        documents = self._match(query)
+        return self._project(documents[0], projection) if documents else None
+    
+    def find(self, query=None, projection=None):
+        self.queries += 1
+        return MemoryCursor([self._project(document, projection) for document in self._match(query)])
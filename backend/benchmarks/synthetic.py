@@ -0,0 +1,118 @@
+"""
+Генератор синтетических документов mainstats в формате SquadJS
+
+Размеры словарей weapons / possess / roles настраиваются: ветераны сервера
+имеют сотни ключей оружия, десятки единиц техники и ролей.
+"""
+import random
+
+from services.stats_service import HEAVY_VEHICLE_WEAPONS, HEAVY_VEHICLES, HELI_VEHICLES
+
+INFANTRY_WEAPONS = [
+    "M4_M68", "M4_ACOG", "M16A4_RCO", "AK74M_1P87", "AKM_Kobra", "SA80_SUSAT",
+    "C7A2_Elcan", "F88_Austeyr", "QBZ95_Iron", "G3A3_Iron", "M249_Iron", "PKM_Iron",
+    "RPK74_Iron", "L86A2_SUSAT", "M110_Leupold", "SVD_PSO1", "M9_Pistol", "MP443_Pistol",
+]
+EXPLOSIVES = [
+    "Projectile_Mortar_HE", "Projectile_Hell_Cannon", "Projectile_RPG7_HEAT",
+    "Projectile_M72_LAW", "Projectile_GP25_HE", "M67_Grenade", "RGD5_Grenade",
+]
+MELEE = ["SOCP_Knife", "AK74Bayonet_Knife", "M9Bayonet_Knife", "Shovel_Melee"]
+
+LIGHT_VEHICLES = ["Truck", "Quad", "MATV", "Tigr", "UAZ", "Logi", "Technical", "Boat"]
+
+ROLES = [
+    "Rifleman", "Medic", "SquadLeader", "Automatic", "Grenadier", "Marksman",
+    "LAT", "HAT", "Engineer", "Sapper", "Crewman", "Pilot", "Scout", "Raider",
+    "Ambusher", "Breacher", "Machinegunner", "Sniper", "Spotter", "Commander",
+]
+FACTIONS = ["USA", "RUS", "GB", "CAF", "PLA", "MEA", "INS", "TLF", "VDV", "ADF", "USMC", "MIL"]
+
+
+def make_weapons(rng, size):
+    """Сгенерировать словарь weapons из size ключей в формате SquadJS"""
+    weapons = {}
+    while len(weapons) < size:
+        roll = rng.random()
+        if roll < 0.35:
+            pattern = rng.choice(HEAVY_VEHICLE_WEAPONS).strip('_')
+            key = f"BP_{pattern}_{rng.choice(['AP', 'HE', 'Frag', 'Gun'])}_C{rng.randint(0, 40)}"
+        elif roll < 0.5:
+            key = f"BP_{rng.choice(EXPLOSIVES)}_C{rng.randint(0, 40)}"
+        elif roll < 0.55:
+            key = f"BP_{rng.choice(MELEE)}_C{rng.randint(0, 10)}"
+        else:
+            key = f"BP_{rng.choice(INFANTRY_WEAPONS)}_C{rng.randint(0, 80)}"
+        weapons[key] = rng.randint(0, 2500)
+    return weapons
+
+
+def make_possess(rng, size):
+    """Словарь possess: {BP_<техника>_<вариант>: время в мс}"""
+    vehicles = HEAVY_VEHICLES + HELI_VEHICLES + LIGHT_VEHICLES
+    possess = {}
+    while len(possess) < size:
+        key = f"BP_{rng.choice(vehicles)}_{rng.choice(['Woodland', 'Desert', 'Snow', 'RWS'])}{rng.randint(0, 9)}"
+        possess[key] = rng.randint(0, 40_000_000)
+    return possess
+
+
+def make_roles(rng, size):
+    """Словарь roles: {<фракция>_<роль>_<n>: время в минутах}"""
+    roles = {}
+    while len(roles) < size:
+        key = f"{rng.choice(FACTIONS)}_{rng.choice(ROLES)}_{rng.randint(1, 3):02d}"
+        roles[key] = rng.randint(0, 20_000)
+    return roles
+
+
+def make_counter(rng, low, high):
+    """Числовое поле: число или объект (как в старых документах SquadJS)"""
+    value = rng.randint(low, high)
+    if rng.random() < 0.1:
+        return {'$numberLong': value}
+    return value
+
+
+def make_mainstats_document(rng, steam_id, weapon_keys=300, possess_keys=40, role_keys=30):
+    """Документ mainstats одного игрока"""
+    matches = rng.randint(0, 3000)
+    kills = rng.randint(0, matches * 12 + 1)
+    return {
+        '_id': steam_id,
+        'playerName': f"Player_{rng.randint(0, 10 ** 6)}",
+        'kills': make_counter(rng, kills, kills),
+        'deaths': make_counter(rng, 0, matches * 10 + 1),
+        'revives': make_counter(rng, 0, matches * 5 + 1),
+        'teamkills': make_counter(rng, 0, matches // 10 + 1),
+        'matches': matches,
+        'wins': rng.randint(0, matches),
+        'time': rng.randint(0, matches * 60 + 1),
+        'commanderTime': rng.choice([0, rng.randint(0, 3000)]),
+        'commanderMatches': rng.randint(0, 50),
+        'squadLeadTime': rng.randint(0, 20_000),
+        'weapons': make_weapons(rng, weapon_keys),
+        'possess': make_possess(rng, possess_keys),
+        'roles': make_roles(rng, role_keys),
+        'scoreGroups': {str(group): rng.randint(0, 200_000) for group in range(1, rng.randint(2, 8))},
+    }
+
+
+def generate_mainstats(count, seed=42, weapon_keys=300, possess_keys=40, role_keys=30):
+    """
+    Сгенерировать count документов
+    
+    Размеры словарей разбрасываются вокруг заданных (от трети до полного размера),
+    чтобы в выборке были и новички, и ветераны.
+    """
+    rng = random.Random(seed)
+    return [
+        make_mainstats_document(
+            rng,
+            f"7656119{index:010d}",
+            weapon_keys=rng.randint(weapon_keys // 3, weapon_keys),
+            possess_keys=rng.randint(possess_keys // 3, possess_keys),
+            role_keys=rng.randint(role_keys // 3, role_keys)
+        )
+        for index in range(count)
+    ]
@@ -29,9 +29,83 @@ class Config:
     # MongoDB (SquadJS statistics)
     MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
     MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'SquadJS')
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))  # на воркер
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 1000))  # ожидание свободного соединения
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 2000))
+    MONGO_HEARTBEAT_FREQUENCY_MS = int(os.getenv('MONGO_HEARTBEAT_FREQUENCY_MS', 10000))
+    # Circuit breaker: открывается после N ошибок подряд, закрывается не раньше чем через cooldown секунд
+    MONGO_BREAKER_THRESHOLD = int(os.getenv('MONGO_BREAKER_THRESHOLD', 3))
+    MONGO_BREAKER_COOLDOWN = int(os.getenv('MONGO_BREAKER_COOLDOWN', 10))
+    
+    # Кэш вычисленной статистики /api/stats/<steam_id>
+    # SquadJS обновляет mainstats только в конце матча, поэтому TTL в минуту безопасен
+    STATS_CACHE_TTL = int(os.getenv('STATS_CACHE_TTL', 60))  # секунды, 0 - отключить
+    STATS_CACHE_MAX_ENTRIES = int(os.getenv('STATS_CACHE_MAX_ENTRIES', 5000))
+    STATS_CACHE_MAX_BYTES = int(os.getenv('STATS_CACHE_MAX_BYTES', 32 * 1024 * 1024))  # 32MB
+    
+    # POST /api/stats/batch - максимум Steam ID в одном запросе
+    STATS_BATCH_MAX_IDS = int(os.getenv('STATS_BATCH_MAX_IDS', 300))
+    
+    # Материализованная таблица лидеров (снимок пересобирается в фоне)
+    LEADERBOARD_REFRESH_INTERVAL = int(os.getenv('LEADERBOARD_REFRESH_INTERVAL', 300))  # секунды, 0 - без фона
+    LEADERBOARD_BATCH_SIZE = int(os.getenv('LEADERBOARD_BATCH_SIZE', 5000))
+    LEADERBOARD_MAX_LIMIT = int(os.getenv('LEADERBOARD_MAX_LIMIT', 100))
+    # Порог матчей по умолчанию для сортировки по K/D и винрейту
+    LEADERBOARD_MIN_MATCHES = int(os.getenv('LEADERBOARD_MIN_MATCHES', 10))
+    LEADERBOARD_MATCH_THRESHOLDS = tuple(
+        int(x) for x in os.getenv('LEADERBOARD_MATCH_THRESHOLDS', '0,10,50,100').split(',')
+    )
+    
+    # Фоновое обновление stats_snapshot участников кланов и pending заявок
+    STATS_SNAPSHOT_INTERVAL = int(os.getenv('STATS_SNAPSHOT_INTERVAL', 900))  # секунды, 0 - отключить
+    STATS_SNAPSHOT_BATCH_SIZE = int(os.getenv('STATS_SNAPSHOT_BATCH_SIZE', 500))  # Steam ID на один $in
+    
+    # Потоковый экспорт статистики (GET /api/stats/export): размер пачки курсора MongoDB
+    STATS_EXPORT_BATCH_SIZE = int(os.getenv('STATS_EXPORT_BATCH_SIZE', 1000))
+    
+    # История статистики (дельты счётчиков между снятиями)
+    STATS_HISTORY_INTERVAL = int(os.getenv('STATS_HISTORY_INTERVAL', 3600))  # секунды, 0 - отключить
+    STATS_HISTORY_BATCH_SIZE = int(os.getenv('STATS_HISTORY_BATCH_SIZE', 5000))
+    STATS_HISTORY_RETENTION_DAYS = int(os.getenv('STATS_HISTORY_RETENTION_DAYS', 180))
+    
+    # Онлайн-статусы участников кланов: фоновый опрос Steam Web API (нужен STEAM_WEB_API_KEY)
+    STEAM_PRESENCE_INTERVAL = int(os.getenv('STEAM_PRESENCE_INTERVAL', 60))  # секунды, 0 - отключить
+    STEAM_PRESENCE_MAX_AGE = int(os.getenv('STEAM_PRESENCE_MAX_AGE', 300))  # старше - статус по last_login
+    
+    # Перцентили K/D и винрейта считаются среди игроков с таким числом матчей
+    PERCENTILE_MIN_MATCHES = int(os.getenv('PERCENTILE_MIN_MATCHES', 50))
+    
+    # Кэш конфигурации рангов (configs, type=score)
+    RANK_CONFIG_TTL = int(os.getenv('RANK_CONFIG_TTL', 300))  # секунды
+    
+    # Поиск игроков по имени (player_names + pg_trgm, синхронизируется со снимком таблицы лидеров)
+    SEARCH_RESULT_LIMIT = int(os.getenv('SEARCH_RESULT_LIMIT', 10))
+    SEARCH_MAX_CANDIDATES = int(os.getenv('SEARCH_MAX_CANDIDATES', 5000))
+    SEARCH_TIME_BUDGET_MS = int(os.getenv('SEARCH_TIME_BUDGET_MS', 50))
+    SEARCH_MAX_QUERY_LENGTH = int(os.getenv('SEARCH_MAX_QUERY_LENGTH', 64))
+    SEARCH_SYNC_INTERVAL = int(os.getenv('SEARCH_SYNC_INTERVAL', 900))  # секунды между синхронизациями имён
+    SEARCH_SYNC_BATCH_SIZE = int(os.getenv('SEARCH_SYNC_BATCH_SIZE', 5000))
+    
+    # Сжатие JSON-ответов (gzip; brotli, если установлен пакет brotli)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))  # байт, меньше - без сжатия
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+    # Кэш сжатых тел ответов с ETag
+    COMPRESSION_CACHE_TTL = int(os.getenv('COMPRESSION_CACHE_TTL', 300))  # секунды, 0 - отключить
+    COMPRESSION_CACHE_MAX_BYTES = int(os.getenv('COMPRESSION_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+    
+    # Заголовок X-Query-Count (число SQL-запросов за запрос); в DEBUG включён всегда
+    QUERY_COUNT_HEADER = os.getenv('QUERY_COUNT_HEADER', 'false').lower() == 'true'
+    
+    # Курсорная пагинация списков (кланы, игроки, заявки, приглашения)
+    PAGE_DEFAULT_LIMIT = int(os.getenv('PAGE_DEFAULT_LIMIT', 50))
+    PAGE_MAX_LIMIT = int(os.getenv('PAGE_MAX_LIMIT', 100))
     
     # Authentication
     STEAM_API_KEY = os.getenv('STEAM_API_KEY')
+    STEAM_WEB_API_KEY = os.getenv('STEAM_WEB_API_KEY')  # онлайн-статусы (services/steam_service)
     DISCORD_CLIENT_ID = os.getenv('DISCORD_CLIENT_ID')
     DISCORD_CLIENT_SECRET = os.getenv('DISCORD_CLIENT_SECRET')
     
@@ -0,0 +1,18 @@
+-- Миграция: Денормализованные member_count и owner_player_id в clans
+-- Описание: количество участников и владелец клана хранятся в самой строке клана,
+--           списки и карточки кланов отдаются без JOIN на clan_members.
+--           Поля обновляются в той же транзакции, что и состав клана
+--           (services/clan_service.sync_clan_summary).
+
+ALTER TABLE clans ADD COLUMN IF NOT EXISTS member_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE clans ADD COLUMN IF NOT EXISTS owner_player_id UUID;
+
+-- Backfill (то же самое делает `flask repair-clan-summary`)
+UPDATE clans SET
+    member_count = (SELECT COUNT(*) FROM clan_members WHERE clan_members.clan_id = clans.id),
+    owner_player_id = (
+        SELECT player_id FROM clan_members
+        WHERE clan_members.clan_id = clans.id AND clan_members.role = 'owner'
+        ORDER BY joined_at
+        LIMIT 1
+    );
@@ -0,0 +1,14 @@
+-- Миграция: Индексы для курсорной пагинации списков
+-- Описание: списки кланов, игроков, заявок и приглашений листаются по (created_at DESC, id DESC)
+--           (services/pagination). Составные индексы дают чтение страницы без сортировки
+--           всей таблицы; created_at игроков становится NOT NULL, чтобы курсор был полным.
+
+UPDATE players SET created_at = COALESCE(last_login, NOW() AT TIME ZONE 'UTC') WHERE created_at IS NULL;
+ALTER TABLE players ALTER COLUMN created_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_clans_created_at_id ON clans (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_players_created_at_id ON players (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_clan_applications_clan_page ON clan_applications (clan_id, status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_clan_applications_player_page ON clan_applications (player_id, status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_clan_invitations_clan_page ON clan_invitations (clan_id, status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_clan_invitations_player_page ON clan_invitations (player_id, status, created_at, id);
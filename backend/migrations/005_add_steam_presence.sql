@@ -0,0 +1,11 @@
+-- Миграция: Кэш онлайн-статусов Steam
+-- Описание: фоновый опрос Steam Web API (services/presence_service) пишет статусы участников
+--           кланов в steam_presence; состав клана читает их отсюда без запроса к Steam API.
+
+CREATE TABLE IF NOT EXISTS steam_presence (
+    steam_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    persona_state INTEGER NOT NULL DEFAULT 0,
+    game_id TEXT,
+    updated_at TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'UTC')
+);
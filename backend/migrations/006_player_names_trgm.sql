@@ -0,0 +1,23 @@
+-- Миграция: Поиск игроков по имени в PostgreSQL (pg_trgm)
+-- Описание: имена игроков снимка таблицы лидеров хранятся в player_names; префикс ищется
+--           по btree text_pattern_ops, подстрока - по GIN-индексу триграмм. Таблицу
+--           синхронизирует один воркер (services/search_service), task_runs хранит время
+--           последнего запуска фоновых задач, общее для всех воркеров.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS player_names (
+    steam_id TEXT PRIMARY KEY,
+    player_name TEXT NOT NULL,
+    name_normalized TEXT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'UTC')
+);
+
+CREATE INDEX IF NOT EXISTS ix_player_names_prefix ON player_names (name_normalized text_pattern_ops);
+CREATE INDEX IF NOT EXISTS ix_player_names_trgm ON player_names USING gin (name_normalized gin_trgm_ops);
+
+CREATE TABLE IF NOT EXISTS task_runs (
+    name TEXT PRIMARY KEY,
+    finished_at TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'UTC'),
+    result JSONB
+);
@@ -9,5 +9,10 @@ from .clan_application import ClanApplication
 from .clan_invitation import ClanInvitation
 from .session import Session
 from .oauth_state import OAuthState
+from .stat_totals import StatTotals
+from .stat_delta import StatDelta
+from .steam_presence import SteamPresence
+from .player_name import PlayerName
+from .task_run import TaskRun
 
-__all__ = ['db', 'Player', 'Clan', 'ClanMember', 'ClanApplication', 'ClanInvitation', 'Session', 'OAuthState']
+__all__ = ['db', 'Player', 'Clan', 'ClanMember', 'ClanApplication', 'ClanInvitation', 'Session', 'OAuthState', 'StatTotals', 'StatDelta', 'SteamPresence', 'PlayerName', 'TaskRun']
@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from . import db
+from .clan_member import ClanMember
 
 
 class Clan(db.Model):
@@ -19,14 +20,31 @@ class Clan(db.Model):
     winrate = db.Column(db.Float, nullable=False, default=0.0)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
+    # Денормализованные поля: обновляются в той же транзакции, что и состав клана
+    # (services/clan_service.sync_clan_summary), починка - flask repair-clan-summary
+    member_count = db.Column(db.Integer, nullable=False, default=0)
+    owner_player_id = db.Column(UUID(as_uuid=True), nullable=True)
+    
+    # Курсорная пагинация списков (services/pagination)
+    __table_args__ = (
+        db.Index('ix_clans_created_at_id', 'created_at', 'id'),
+    )
+    
     # Relationships
     members = db.relationship('ClanMember', back_populates='clan', cascade='all, delete-orphan')
     applications = db.relationship('ClanApplication', back_populates='clan', cascade='all, delete-orphan')
     
-    def to_dict(self, include_members=False):
-        # Найти владельца клана
-        owner = next((m for m in self.members if m.role == 'owner'), None)
+    @classmethod
+    def query_with_members(cls):
+        """
+        Запрос кланов для to_dict(include_members=True)
         
+        Участники подгружаются одним SELECT ... IN по всем кланам выборки, их игроки -
+        JOIN в том же запросе: 2 запроса на любой состав и любое число кланов.
+        """
+        return cls.query.options(db.selectinload(cls.members).joinedload(ClanMember.player))
+    
+    def to_dict(self, include_members=False):
         data = {
             'id': str(self.id),
             'name': self.name,
@@ -39,9 +57,9 @@ class Clan(db.Model):
             'level': self.level,
             'winrate': self.winrate,
             'createdAt': self.created_at.isoformat() if self.created_at else None,
-            'memberCount': len(self.members),
+            'memberCount': self.member_count or 0,
             'isRecruiting': self.requirements.get('isOpen', True) if self.requirements else True,
-            'ownerId': str(owner.player_id) if owner else None
+            'ownerId': str(self.owner_player_id) if self.owner_player_id else None
         }
         
         if include_members:
@@ -49,5 +67,13 @@ class Clan(db.Model):
         
         return data
     
+    def to_summary(self):
+        """Краткая карточка клана для строк списков (заявки, приглашения)"""
+        return {
+            'id': str(self.id),
+            'name': self.name,
+            'tag': self.tag
+        }
+    
     def __repr__(self):
         return f'<Clan [{self.tag}] {self.name}>'
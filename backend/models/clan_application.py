@@ -18,12 +18,20 @@ class ClanApplication(db.Model):
     # Unique constraint - один игрок может иметь только одну активную заявку в клан
     __table_args__ = (
         db.UniqueConstraint('clan_id', 'player_id', name='unique_clan_application'),
+        # Курсорная пагинация заявок клана и заявок игрока
+        db.Index('ix_clan_applications_clan_page', 'clan_id', 'status', 'created_at', 'id'),
+        db.Index('ix_clan_applications_player_page', 'player_id', 'status', 'created_at', 'id'),
     )
     
     # Relationships
     clan = db.relationship('Clan', back_populates='applications')
     player = db.relationship('Player', back_populates='applications')
     
+    @classmethod
+    def query_with_related(cls):
+        """Запрос заявок для to_row(): игрок и клан - JOIN в том же запросе"""
+        return cls.query.options(db.joinedload(cls.player), db.joinedload(cls.clan))
+    
     def to_dict(self):
         return {
             'id': str(self.id),
@@ -34,11 +42,21 @@ class ClanApplication(db.Model):
             'statsSnapshot': self.stats_snapshot or {},
             'createdAt': self.created_at.isoformat() if self.created_at else None,
             'player': self.player.to_dict() if self.player else None,
-            'clan': {
-                'id': str(self.clan.id),
-                'name': self.clan.name,
-                'tag': self.clan.tag
-            } if self.clan else None
+            'clan': self.clan.to_summary() if self.clan else None
+        }
+    
+    def to_row(self):
+        """Компактная строка для списков заявок"""
+        return {
+            'id': str(self.id),
+            'clanId': str(self.clan_id),
+            'playerId': str(self.player_id),
+            'message': self.message,
+            'status': self.status,
+            'statsSnapshot': self.stats_snapshot or {},
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'player': self.player.to_summary() if self.player else None,
+            'clan': self.clan.to_summary() if self.clan else None
         }
     
     def __repr__(self):
@@ -18,6 +18,9 @@ class ClanInvitation(db.Model):
     # Unique constraint - один игрок может иметь только одно активное приглашение в клан
     __table_args__ = (
         db.UniqueConstraint('clan_id', 'player_id', name='unique_clan_invitation'),
+        # Курсорная пагинация приглашений клана и приглашений игрока
+        db.Index('ix_clan_invitations_clan_page', 'clan_id', 'status', 'created_at', 'id'),
+        db.Index('ix_clan_invitations_player_page', 'player_id', 'status', 'created_at', 'id'),
     )
     
     # Relationships
@@ -25,6 +28,15 @@ class ClanInvitation(db.Model):
     player = db.relationship('Player', foreign_keys=[player_id], backref='invitations')
     invited_by = db.relationship('Player', foreign_keys=[invited_by_id])
     
+    @classmethod
+    def query_with_related(cls):
+        """Запрос приглашений для to_row(): игрок, пригласивший и клан - JOIN в том же запросе"""
+        return cls.query.options(
+            db.joinedload(cls.player),
+            db.joinedload(cls.invited_by),
+            db.joinedload(cls.clan)
+        )
+    
     def to_dict(self):
         return {
             'id': str(self.id),
@@ -36,11 +48,22 @@ class ClanInvitation(db.Model):
             'createdAt': self.created_at.isoformat() if self.created_at else None,
             'player': self.player.to_dict() if self.player else None,
             'invitedBy': self.invited_by.to_dict() if self.invited_by else None,
-            'clan': {
-                'id': str(self.clan.id),
-                'name': self.clan.name,
-                'tag': self.clan.tag
-            } if self.clan else None
+            'clan': self.clan.to_summary() if self.clan else None
+        }
+    
+    def to_row(self):
+        """Компактная строка для списков приглашений"""
+        return {
+            'id': str(self.id),
+            'clanId': str(self.clan_id),
+            'playerId': str(self.player_id),
+            'invitedById': str(self.invited_by_id),
+            'message': self.message,
+            'status': self.status,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'player': self.player.to_summary() if self.player else None,
+            'invitedBy': self.invited_by.to_summary() if self.invited_by else None,
+            'clan': self.clan.to_summary() if self.clan else None
         }
     
     def __repr__(self):
@@ -15,9 +15,14 @@ class Player(db.Model):
     discord_avatar_url = db.Column(db.Text, nullable=True)
     avatar_url = db.Column(db.Text, nullable=True)
     current_clan_id = db.Column(UUID(as_uuid=True), db.ForeignKey('clans.id', ondelete='SET NULL'), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
     
+    # Курсорная пагинация списков (services/pagination)
+    __table_args__ = (
+        db.Index('ix_players_created_at_id', 'created_at', 'id'),
+    )
+    
     # Relationships
     current_clan = db.relationship('Clan', foreign_keys=[current_clan_id], backref='current_members')
     memberships = db.relationship('ClanMember', back_populates='player', cascade='all, delete-orphan')
@@ -76,5 +81,14 @@ class Player(db.Model):
         
         return result
     
+    def to_summary(self):
+        """Краткая карточка игрока для строк списков (заявки, приглашения)"""
+        return {
+            'id': str(self.id),
+            'steamId': self.steam_id,
+            'username': self.username,
+            'avatarUrl': self.avatar_url
+        }
+    
     def __repr__(self):
         return f'<Player {self.username} ({self.steam_id})>'
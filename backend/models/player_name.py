@@ -0,0 +1,31 @@
+from datetime import datetime
+from . import db
+
+
+class PlayerName(db.Model):
+    """Имя игрока из mainstats для поиска (pg_trgm); синхронизируется со снимком таблицы лидеров"""
+    __tablename__ = 'player_names'
+    
+    steam_id = db.Column(db.Text, primary_key=True)
+    player_name = db.Column(db.Text, nullable=False)  # как в mainstats - для сравнения при синхронизации
+    name_normalized = db.Column(db.Text, nullable=False)  # search_service.normalize_name
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    # Префикс (LIKE 'q%') - btree text_pattern_ops, подстрока (LIKE '%q%') - GIN по триграммам
+    __table_args__ = (
+        db.Index('ix_player_names_prefix', 'name_normalized',
+                 postgresql_ops={'name_normalized': 'text_pattern_ops'}),
+        db.Index('ix_player_names_trgm', 'name_normalized',
+                 postgresql_using='gin', postgresql_ops={'name_normalized': 'gin_trgm_ops'}),
+    )
+    
+    def __repr__(self):
+        return f'<PlayerName {self.steam_id} {self.player_name}>'
+
+
+# gin_trgm_ops требует расширения pg_trgm до создания индекса (db.create_all)
+db.event.listen(
+    PlayerName.__table__,
+    'before_create',
+    db.DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
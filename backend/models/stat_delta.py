@@ -0,0 +1,39 @@
+from . import db
+
+
+class StatDelta(db.Model):
+    """
+    Прирост счётчиков игрока между двумя снятиями истории
+    
+    Строка пишется только если что-то изменилось. Первичный ключ
+    (steam_id, captured_at) - история игрока читается одним range scan.
+    """
+    __tablename__ = 'stat_deltas'
+    
+    steam_id = db.Column(db.Text, primary_key=True)
+    captured_at = db.Column(db.DateTime, primary_key=True)
+    kills = db.Column(db.Integer, nullable=False, default=0)
+    deaths = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+    matches = db.Column(db.Integer, nullable=False, default=0)
+    revives = db.Column(db.Integer, nullable=False, default=0)
+    playtime = db.Column(db.Integer, nullable=False, default=0)  # минуты
+    
+    # Для удаления строк старше срока хранения
+    __table_args__ = (
+        db.Index('ix_stat_deltas_captured_at', 'captured_at'),
+    )
+    
+    def to_dict(self):
+        return {
+            'capturedAt': self.captured_at.isoformat(),
+            'kills': self.kills,
+            'deaths': self.deaths,
+            'wins': self.wins,
+            'matches': self.matches,
+            'revives': self.revives,
+            'playtimeMinutes': self.playtime
+        }
+    
+    def __repr__(self):
+        return f'<StatDelta {self.steam_id} at {self.captured_at}>'
@@ -0,0 +1,19 @@
+from datetime import datetime
+from . import db
+
+
+class StatTotals(db.Model):
+    """Итоговые счётчики игрока на момент последнего снятия истории (база для дельт)"""
+    __tablename__ = 'stat_totals'
+    
+    steam_id = db.Column(db.Text, primary_key=True)
+    kills = db.Column(db.BigInteger, nullable=False, default=0)
+    deaths = db.Column(db.BigInteger, nullable=False, default=0)
+    wins = db.Column(db.BigInteger, nullable=False, default=0)
+    matches = db.Column(db.BigInteger, nullable=False, default=0)
+    revives = db.Column(db.BigInteger, nullable=False, default=0)
+    playtime = db.Column(db.BigInteger, nullable=False, default=0)  # минуты
+    captured_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<StatTotals {self.steam_id} at {self.captured_at}>'
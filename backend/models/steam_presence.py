@@ -0,0 +1,16 @@
+from datetime import datetime
+from . import db
+
+
+class SteamPresence(db.Model):
+    """Последний известный статус игрока в Steam (пишет фоновый опрос, читают все воркеры)"""
+    __tablename__ = 'steam_presence'
+    
+    steam_id = db.Column(db.Text, primary_key=True)
+    status = db.Column(db.Text, nullable=False)  # В СЕТИ|В ИГРЕ|НЕ В СЕТИ
+    persona_state = db.Column(db.Integer, nullable=False, default=0)  # personastate Steam API
+    game_id = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SteamPresence {self.steam_id} {self.status} at {self.updated_at}>'
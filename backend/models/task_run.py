@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import JSONB
+from . import db
+
+
+class TaskRun(db.Model):
+    """Последний завершённый запуск фоновой задачи, общий для всех воркеров"""
+    __tablename__ = 'task_runs'
+    
+    name = db.Column(db.Text, primary_key=True)
+    finished_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    result = db.Column(JSONB, nullable=True)
+    
+    def __repr__(self):
+        return f'<TaskRun {self.name} at {self.finished_at}>'
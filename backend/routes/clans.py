@@ -3,17 +3,34 @@ from sqlalchemy.exc import IntegrityError
 from . import api
 from models import db, Clan, ClanMember, ClanApplication, ClanInvitation, Player
 from services.auth_service import require_auth
+from services.clan_service import sync_clan_summary
+from services.mongo_service import get_collection
+from services.pagination import PaginationError, paginate
+from services.presence_service import get_presence_statuses
+from services.query_counter import query_budget
+from services.snapshot_service import get_stats_snapshot
+from services.stats_service import clan_stats_pipeline, summarize_clan_stats
+import pymongo.errors
 
 
 @api.route('/clans', methods=['GET'])
+@query_budget(1)
 def get_clans():
-    """Получить список всех кланов"""
+    """Получить список кланов (страницами: limit, cursor)"""
     try:
-        clans = Clan.query.order_by(Clan.created_at.desc()).all()
+        # memberCount и ownerId хранятся в строке клана - один запрос без JOIN
+        clans, limit, next_cursor = paginate(Clan.query, Clan)
         return jsonify({
             'success': True,
-            'clans': [clan.to_dict() for clan in clans]
+            'clans': [clan.to_dict() for clan in clans],
+            'limit': limit,
+            'next': next_cursor
         }), 200
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -22,10 +39,11 @@ def get_clans():
 
 
 @api.route('/clans/<clan_id>', methods=['GET'])
+@query_budget(2)
 def get_clan(clan_id):
     """Получить информацию о конкретном клане"""
     try:
-        clan = Clan.query.get(clan_id)
+        clan = Clan.query_with_members().filter_by(id=clan_id).first()
         if not clan:
             return jsonify({
                 'success': False,
@@ -125,6 +143,7 @@ def create_clan():
             
             # Обновляем current_clan_id игрока
             player.current_clan_id = clan.id
+            sync_clan_summary(clan.id)
         
         db.session.commit()
         
@@ -265,8 +284,9 @@ def delete_clan(clan_id):
 
 
 @api.route('/clans/<clan_id>/members', methods=['GET'])
+@query_budget(3)
 def get_clan_members(clan_id):
-    """Получить список участников клана с реальными онлайн статусами из Steam API"""
+    """Получить список участников клана с онлайн статусами Steam (кэш фонового опроса)"""
     try:
         clan = Clan.query.get(clan_id)
         if not clan:
@@ -275,42 +295,95 @@ def get_clan_members(clan_id):
                 'error': 'Клан не найден'
             }), 404
         
-        members = ClanMember.query.filter_by(clan_id=clan_id).all()
+        members = ClanMember.query.options(
+            db.joinedload(ClanMember.player)
+        ).filter_by(clan_id=clan_id).all()
         
-        # Получаем онлайн статусы через Steam API (batch запрос эффективнее)
-        try:
-            from services.steam_service import steam_service
-            
-            # Собираем все Steam ID
-            steam_ids = [m.player.steam_id for m in members if m.player and m.player.steam_id]
-            
-            # Получаем статусы одним запросом (до 100 игроков за раз)
-            statuses = steam_service.get_online_statuses(steam_ids) if steam_ids else {}
-            
-            # Формируем ответ с использованием полученных статусов
-            members_data = []
-            for member in members:
-                member_dict = member.to_dict(include_online_status=False)
-                
-                # Добавляем онлайн статус из Steam API
-                if member.player and member.player.steam_id in statuses:
-                    if 'player' in member_dict and member_dict['player']:
-                        member_dict['player']['onlineStatus'] = statuses[member.player.steam_id]
-                
-                members_data.append(member_dict)
+        # Онлайн статусы из steam_presence (фоновый опрос Steam API), в запросе Steam API не вызывается
+        steam_ids = [m.player.steam_id for m in members if m.player and m.player.steam_id]
+        statuses = get_presence_statuses(steam_ids, current_app.config.get('STEAM_PRESENCE_MAX_AGE', 300))
+        
+        members_data = []
+        for member in members:
+            # Статус по last_login - fallback, если свежего статуса Steam нет
+            member_dict = member.to_dict(include_online_status=True, use_steam_api=False)
             
-            return jsonify({
-                'success': True,
-                'members': members_data
-            }), 200
+            if member.player and member.player.steam_id in statuses:
+                member_dict['player']['onlineStatus'] = statuses[member.player.steam_id]
             
-        except Exception as steam_error:
-            # Fallback на last_login если Steam API недоступен
-            print(f"[STEAM API ERROR] Используем fallback на last_login: {steam_error}")
+            members_data.append(member_dict)
+        
+        return jsonify({
+            'success': True,
+            'members': members_data
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/clans/<clan_id>/stats', methods=['GET'])
+def get_clan_stats(clan_id):
+    """Суммарная и средняя статистика участников клана (одна агрегация в MongoDB)"""
+    try:
+        clan = Clan.query.get(clan_id)
+        if not clan:
             return jsonify({
-                'success': True,
-                'members': [member.to_dict(include_online_status=True, use_steam_api=False) for member in members]
-            }), 200
+                'success': False,
+                'error': 'Клан не найден'
+            }), 404
+        
+        rows = db.session.query(
+            ClanMember.id, ClanMember.player_id, ClanMember.role, Player.steam_id, Player.username
+        ).join(Player, ClanMember.player_id == Player.id).filter(ClanMember.clan_id == clan_id).all()
+        
+        steam_ids = [row.steam_id for row in rows]
+        warning = None
+        aggregation_result = {}
+        
+        if steam_ids:
+            try:
+                collection = get_collection('mainstats')
+                aggregation_result = next(collection.aggregate(clan_stats_pipeline(steam_ids)), {})
+            except (RuntimeError, pymongo.errors.PyMongoError):
+                # MongoDB недоступен - отдаём нулевую статистику (graceful degradation)
+                warning = 'Statistics service temporarily unavailable'
+        
+        totals, averages, members_stats = summarize_clan_stats(aggregation_result)
+        
+        members = []
+        for row in rows:
+            member_stats = members_stats.get(row.steam_id)
+            members.append({
+                'memberId': str(row.id),
+                'playerId': str(row.player_id),
+                'steamId': row.steam_id,
+                'username': row.username,
+                'role': row.role,
+                'hasStats': member_stats is not None,
+                'stats': member_stats
+            })
+        
+        members.sort(key=lambda m: m['stats']['kills'] if m['stats'] else -1, reverse=True)
+        
+        response = {
+            'success': True,
+            'clanId': str(clan.id),
+            'stats': {
+                'memberCount': len(rows),
+                'trackedMembers': len(members_stats),
+                'totals': totals,
+                'averages': averages,
+                'members': members
+            }
+        }
+        if warning:
+            response['warning'] = warning
+        
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({
@@ -359,6 +432,7 @@ def join_clan(clan_id):
         
         player.current_clan_id = clan_id
         db.session.add(member)
+        sync_clan_summary(clan_id)
         db.session.commit()
         
         return jsonify({
@@ -412,6 +486,7 @@ def leave_clan(clan_id):
         ).delete()
         
         db.session.delete(member)
+        sync_clan_summary(clan_id)
         db.session.commit()
         
         return jsonify({
@@ -474,6 +549,7 @@ def kick_member(clan_id, member_id):
         ).delete()
         
         db.session.delete(member)
+        sync_clan_summary(clan_id)
         db.session.commit()
         
         return jsonify({
@@ -564,6 +640,7 @@ def change_member_role(clan_id, member_id):
             # Обычное изменение роли (не связанное с передачей прав owner)
             member.role = new_role
         
+        sync_clan_summary(clan_id)
         db.session.commit()
         
         return jsonify({
@@ -656,6 +733,7 @@ def apply_to_clan(clan_id):
 
 @api.route('/clans/<clan_id>/applications', methods=['GET'])
 @require_auth
+@query_budget(2)
 def get_clan_applications(clan_id):
     """Получить список заявок в клан (только для владельца)"""
     try:
@@ -675,16 +753,23 @@ def get_clan_applications(clan_id):
             }), 403
         
         status = request.args.get('status', 'pending')
-        applications = ClanApplication.query.filter_by(
+        applications, limit, next_cursor = paginate(ClanApplication.query_with_related().filter_by(
             clan_id=clan_id,
             status=status
-        ).order_by(ClanApplication.created_at.desc()).all()
+        ), ClanApplication)
         
         return jsonify({
             'success': True,
-            'applications': [app.to_dict() for app in applications]
+            'applications': [app.to_row() for app in applications],
+            'limit': limit,
+            'next': next_cursor
         }), 200
         
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -739,7 +824,7 @@ def create_clan_application(clan_id):
             player_id=player.id,
             message=message,
             status='pending',
-            stats_snapshot={}  # TODO: добавить snapshot статистики игрока
+            stats_snapshot=get_stats_snapshot(player.steam_id)  # дальше обновляется фоновым snapshotter'ом
         )
         
         db.session.add(application)
@@ -757,21 +842,29 @@ def create_clan_application(clan_id):
 
 @api.route('/applications/my', methods=['GET'])
 @require_auth
+@query_budget(1)
 def get_my_applications():
     """Получить мои активные заявки"""
     try:
         player = request.current_player
         
-        applications = ClanApplication.query.filter_by(
+        applications, limit, next_cursor = paginate(ClanApplication.query_with_related().filter_by(
             player_id=player.id,
             status='pending'
-        ).order_by(ClanApplication.created_at.desc()).all()
+        ), ClanApplication)
         
         return jsonify({
             'success': True,
-            'applications': [app.to_dict() for app in applications]
+            'applications': [app.to_row() for app in applications],
+            'limit': limit,
+            'next': next_cursor
         }), 200
         
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -848,6 +941,7 @@ def approve_application(clan_id, application_id):
         for other_app in other_applications:
             other_app.status = 'rejected'
         
+        sync_clan_summary(clan_id)
         db.session.commit()
         
         return jsonify({
@@ -1036,21 +1130,29 @@ def invite_to_clan(clan_id):
 
 @api.route('/invitations/my', methods=['GET'])
 @require_auth
+@query_budget(1)
 def get_my_invitations():
     """Получить мои приглашения"""
     try:
         player = request.current_player
         
-        invitations = ClanInvitation.query.filter_by(
+        invitations, limit, next_cursor = paginate(ClanInvitation.query_with_related().filter_by(
             player_id=player.id,
             status='pending'
-        ).order_by(ClanInvitation.created_at.desc()).all()
+        ), ClanInvitation)
         
         return jsonify({
             'success': True,
-            'invitations': [inv.to_dict() for inv in invitations]
+            'invitations': [inv.to_row() for inv in invitations],
+            'limit': limit,
+            'next': next_cursor
         }), 200
         
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1060,6 +1162,7 @@ def get_my_invitations():
 
 @api.route('/clans/<clan_id>/invitations', methods=['GET'])
 @require_auth
+@query_budget(2)
 def get_clan_invitations(clan_id):
     """Получить список приглашений клана (только для владельца)"""
     try:
@@ -1079,16 +1182,23 @@ def get_clan_invitations(clan_id):
             }), 403
         
         status = request.args.get('status', 'pending')
-        invitations = ClanInvitation.query.filter_by(
+        invitations, limit, next_cursor = paginate(ClanInvitation.query_with_related().filter_by(
             clan_id=clan_id,
             status=status
-        ).order_by(ClanInvitation.created_at.desc()).all()
+        ), ClanInvitation)
         
         return jsonify({
             'success': True,
-            'invitations': [inv.to_dict() for inv in invitations]
+            'invitations': [inv.to_row() for inv in invitations],
+            'limit': limit,
+            'next': next_cursor
         }), 200
         
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1133,6 +1243,7 @@ def accept_invitation(invitation_id):
         invitation.status = 'accepted'
         
         db.session.add(member)
+        sync_clan_summary(invitation.clan_id)
         db.session.commit()
         
         return jsonify({
@@ -1308,6 +1419,7 @@ def admin_assign_owner(clan_id):
         for current_owner in other_owners:
             current_owner.role = 'member'
         
+        sync_clan_summary(clan_id)
         db.session.commit()
         
         return jsonify({
@@ -1326,6 +1438,7 @@ def admin_assign_owner(clan_id):
 
 @api.route('/admin/clans', methods=['GET'])
 @require_auth
+@query_budget(2)
 def admin_get_all_clans():
     """Получить все кланы с детальной информацией (только для админов)"""
     # Проверка прав админа
@@ -1337,11 +1450,18 @@ def admin_get_all_clans():
         }), 403
     
     try:
-        clans = Clan.query.order_by(Clan.created_at.desc()).all()
+        clans, limit, next_cursor = paginate(Clan.query_with_members(), Clan)
         return jsonify({
             'success': True,
-            'clans': [clan.to_dict(include_members=True) for clan in clans]
+            'clans': [clan.to_dict(include_members=True) for clan in clans],
+            'limit': limit,
+            'next': next_cursor
         }), 200
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
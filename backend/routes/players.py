@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from models import db
 from models.player import Player
 from services.auth_service import require_auth
+from services.pagination import PaginationError, paginate
 
 bp = Blueprint('players', __name__, url_prefix='/api/players')
 
@@ -74,10 +75,18 @@ def get_player_by_steam_id(steam_id):
 
 @bp.route('', methods=['GET'])
 def get_players():
-    """Получить список всех игроков"""
-    players = Player.query.all()
+    """Получить список игроков (страницами: limit, cursor)"""
+    try:
+        players, limit, next_cursor = paginate(Player.query, Player)
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     
     return jsonify({
         'success': True,
-        'players': [p.to_dict() for p in players]
+        'players': [p.to_dict() for p in players],
+        'limit': limit,
+        'next': next_cursor
     })
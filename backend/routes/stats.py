@@ -1,13 +1,24 @@
-from flask import jsonify
+import csv
+import io
+
+from flask import Response, jsonify, request, current_app, stream_with_context
 from . import api
+from services.auth_service import require_auth
+from services.cache_service import stats_cache
+from services.history_service import get_history, parse_window
+from services.leaderboard_service import SORT_FIELDS, WARMING_RETRY_AFTER, leaderboard
 from services.mongo_service import get_collection
+from services.pagination import CursorError, decode_cursor, encode_cursor
+from services.percentile_service import player_percentiles
+from services.rank_service import rank_config_cache
+from services.search_service import player_search
 from services.stats_service import (
-    calc_vehicle_time,
-    calc_vehicle_kills,
-    format_time,
-    get_user_high_score_and_group,
-    categorize_weapons,
-    calculate_kd_ratio
+    ALL_STATS_SECTIONS,
+    calculate_kd_ratio,
+    decode_player_stats,
+    parse_stats_fields,
+    select_stats_sections,
+    stats_projection
 )
 import pymongo.errors
 
@@ -25,111 +36,77 @@ def get_empty_stats(steam_id):
         'matches': 0,
         'wins': 0,
         'winRate': 0.0,
+        'avgKills': 0.0,
         'playtime': '0м',
         'playtimeMinutes': 0
     }
 
 
+def build_player_stats(user, steam_id=None):
+    """Статистика игрока из документа mainstats + перцентили (если снимок уже построен)"""
+    stats = decode_player_stats(user, steam_id).to_dict()
+    percentiles = player_percentiles.lookup(stats)
+    if percentiles is not None:
+        stats['percentiles'] = percentiles
+    return stats
+
+
+def stats_cache_key(steam_id, sections):
+    """Ключ кэша: полная статистика кэшируется под Steam ID, частичная - под (Steam ID, секции)"""
+    return steam_id if sections == ALL_STATS_SECTIONS else (steam_id, sections)
+
+
+def get_cached_stats(steam_id, sections):
+    """Статистика из кэша; частичная может быть вырезана из закэшированной полной"""
+    cached = stats_cache.get(stats_cache_key(steam_id, sections))
+    if cached is None and sections != ALL_STATS_SECTIONS:
+        cached = stats_cache.get(steam_id)
+        if cached is not None:
+            cached = select_stats_sections(cached, sections)
+    return cached
+
+
 @api.route('/stats/<steam_id>', methods=['GET'])
 def get_player_stats(steam_id):
-    """Получить статистику игрока по Steam ID"""
+    """
+    Получить статистику игрока по Steam ID
+    
+    Query params:
+        fields: summary|weapons|vehicles|roles|full через запятую (default full).
+                summary отдаётся всегда, остальные секции добавляются к нему
+    """
+    try:
+        sections = parse_stats_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    cached = get_cached_stats(steam_id, sections)
+    if cached is not None:
+        return jsonify({
+            'success': True,
+            'stats': cached
+        }), 200
+    
     try:
         collection = get_collection('mainstats')
-        user = collection.find_one({'_id': steam_id})
+        user = collection.find_one({'_id': steam_id}, stats_projection(sections))
         
         if not user:
             # Возвращаем пустую статистику вместо 404
+            stats = get_empty_stats(steam_id)
+            stats_cache.set(stats_cache_key(steam_id, sections), stats)
             return jsonify({
                 'success': True,
-                'stats': get_empty_stats(steam_id)
+                'stats': stats
             }), 200
         
-        # Безопасное извлечение числовых полей (могут быть объектами или отсутствовать)
-        def safe_int(value, default=0):
-            """Безопасное извлечение integer из значения"""
-            if isinstance(value, (int, float)):
-                return int(value)
-            elif isinstance(value, dict):
-                # Если это объект, берём первое числовое значение
-                for v in value.values():
-                    if isinstance(v, (int, float)):
-                        return int(v)
-                return default
-            return default
-        
-        kills = safe_int(user.get('kills', 0))
-        deaths = safe_int(user.get('deaths', 0))
-        matches = safe_int(user.get('matches', 0))
-        wins = safe_int(user.get('wins', 0))
-        
-        # Базовая статистика
-        stats = {
-            'steamId': steam_id,
-            'playerName': user.get('playerName', 'Unknown'),
-            'kills': kills,
-            'deaths': deaths,
-            'kd': calculate_kd_ratio(kills, deaths),
-            'revives': safe_int(user.get('revives', 0)),
-            'teamkills': safe_int(user.get('teamkills', 0)),
-            'matches': matches,
-            'wins': wins,
-            'winRate': round((wins / matches) * 100, 1) if matches > 0 else 0,
-        }
-        
-        # Время игры
-        if 'time' in user:
-            stats['playtime'] = format_time(user['time'], 'min')
-            stats['playtimeMinutes'] = user['time']
-        
-        # Время в роли командира и отделения
-        commander_time = safe_int(user.get('commanderTime', 0))
-        commander_matches = safe_int(user.get('commanderMatches', 0))
-        squad_lead_time = safe_int(user.get('squadLeadTime', 0))
-        
-        if commander_time > 0:
-            stats['commanderTime'] = format_time(commander_time, 'min')
-            stats['commanderMatches'] = commander_matches
-        
-        if squad_lead_time > 0:
-            stats['squadLeadTime'] = format_time(squad_lead_time, 'min')
-        
-        # Время в технике
-        if 'possess' in user:
-            heavy_time, heli_time = calc_vehicle_time(user['possess'])
-            stats['heavyVehicleTime'] = format_time(heavy_time / 60000, 'min')  # мс -> минуты
-            stats['heliTime'] = format_time(heli_time / 60000, 'min')
-            stats['heavyVehicleTimeMs'] = heavy_time
-            stats['heliTimeMs'] = heli_time
-        
-        # Убийства из техники
-        if 'weapons' in user:
-            stats['vehicleKills'] = calc_vehicle_kills(user['weapons'])
-            
-            # Категоризированное оружие (топ-10)
-            categorized = categorize_weapons(user['weapons'])
-            sorted_weapons = sorted(categorized.items(), key=lambda x: x[1], reverse=True)
-            stats['topWeapons'] = [
-                {'name': weapon, 'kills': kills} 
-                for weapon, kills in sorted_weapons[:10]
-            ]
-        
-        # Роли (топ-5)
-        if 'roles' in user:
-            sorted_roles = sorted(user['roles'].items(), key=lambda x: x[1], reverse=True)
-            stats['topRoles'] = [
-                {'name': role, 'time': format_time(time, 'min'), 'minutes': time} 
-                for role, time in sorted_roles[:5]
-            ]
-        
-        # Ранговая система
-        if 'scoreGroups' in user:
-            rank_data = get_user_high_score_and_group(user)
-            if rank_data:
-                group_id, score = rank_data
-                stats['rank'] = {
-                    'groupId': group_id,
-                    'score': score
-                }
+        # Вся производная статистика считается за один проход по документу;
+        # незапрошенные словари не загружаются и не обрабатываются
+        stats = build_player_stats(user, steam_id)
+        stats_cache.set(stats_cache_key(steam_id, sections), stats)
         
         return jsonify({
             'success': True,
@@ -152,47 +129,288 @@ def get_player_stats(steam_id):
         }), 200
 
 
-@api.route('/stats/search/<player_name>', methods=['GET'])
-def search_player_by_name(player_name):
-    """Поиск игрока по имени (частичное совпадение)"""
+@api.route('/stats/<steam_id>/history', methods=['GET'])
+def get_player_history(steam_id):
+    """
+    История статистики игрока (прирост счётчиков между снятиями)
+    
+    Query params:
+        window: окно вида 24h / 7d / 30d (default 7d, максимум STATS_HISTORY_RETENTION_DAYS)
+    """
+    window_param = request.args.get('window', '7d')
     try:
-        collection = get_collection('mainstats')
-        
-        # Поиск по частичному совпадению имени (регистронезависимый)
-        users = collection.find(
-            {'playerName': {'$regex': player_name, '$options': 'i'}},
-            {'_id': 1, 'playerName': 1, 'kills': 1, 'deaths': 1}
-        ).limit(10)
+        window = parse_window(window_param, current_app.config.get('STATS_HISTORY_RETENTION_DAYS', 180))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    try:
+        since, totals, series = get_history(steam_id, window)
         
-        # Безопасное извлечение числовых полей
-        def safe_int(value, default=0):
-            if isinstance(value, (int, float)):
-                return int(value)
-            elif isinstance(value, dict):
-                for v in value.values():
-                    if isinstance(v, (int, float)):
-                        return int(v)
-            return default
+        return jsonify({
+            'success': True,
+            'steamId': steam_id,
+            'window': window_param,
+            'since': since.isoformat(),
+            'totals': totals,
+            'series': series,
+            'count': len(series)
+        }), 200
         
-        results = []
-        for user in users:
-            kills = safe_int(user.get('kills', 0))
-            deaths = safe_int(user.get('deaths', 0))
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/stats/batch', methods=['POST'])
+def get_batch_stats():
+    """
+    Получить статистику нескольких игроков одним запросом
+    
+    Body: {"steamIds": ["7656...", ...], "fields": "summary"}  (fields - как в GET /stats/<steam_id>)
+    Ответ: {"stats": {steam_id: stats}} - для отсутствующих игроков пустая статистика
+    """
+    data = request.get_json(silent=True)
+    steam_ids = data.get('steamIds') if isinstance(data, dict) else None
+    
+    if not isinstance(steam_ids, list) or not all(isinstance(s, str) and s for s in steam_ids):
+        return jsonify({
+            'success': False,
+            'error': 'steamIds должен быть списком Steam ID'
+        }), 400
+    
+    try:
+        sections = parse_stats_fields(data.get('fields'))
+    except (ValueError, AttributeError):
+        return jsonify({
+            'success': False,
+            'error': 'fields должен быть строкой summary|weapons|vehicles|roles|full'
+        }), 400
+    
+    max_ids = current_app.config.get('STATS_BATCH_MAX_IDS', 300)
+    steam_ids = list(dict.fromkeys(steam_ids))  # убираем дубли, сохраняя порядок
+    if len(steam_ids) > max_ids:
+        return jsonify({
+            'success': False,
+            'error': f'Максимум {max_ids} Steam ID за запрос'
+        }), 400
+    
+    result = {}
+    missing = []
+    for steam_id in steam_ids:
+        cached = get_cached_stats(steam_id, sections)
+        if cached is not None:
+            result[steam_id] = cached
+        else:
+            missing.append(steam_id)
+    
+    warning = None
+    if missing:
+        try:
+            collection = get_collection('mainstats')
+            # Один курсор с $in вместо find_one на каждого игрока
+            for user in collection.find({'_id': {'$in': missing}}, stats_projection(sections)):
+                stats = build_player_stats(user)
+                stats_cache.set(stats_cache_key(user['_id'], sections), stats)
+                result[user['_id']] = stats
             
-            results.append({
-                'steamId': user['_id'],
-                'playerName': user.get('playerName', 'Unknown'),
-                'kills': kills,
-                'deaths': deaths,
-                'kd': calculate_kd_ratio(kills, deaths)
-            })
+            for steam_id in missing:
+                if steam_id not in result:
+                    stats = get_empty_stats(steam_id)
+                    stats_cache.set(stats_cache_key(steam_id, sections), stats)
+                    result[steam_id] = stats
+        
+        except (RuntimeError, pymongo.errors.PyMongoError):
+            # MongoDB недоступен - пустая статистика для незакэшированных игроков
+            warning = 'Statistics service temporarily unavailable'
+        except Exception:
+            warning = 'Error loading statistics'
+        
+        if warning:
+            for steam_id in missing:
+                result.setdefault(steam_id, get_empty_stats(steam_id))
+    
+    response = {
+        'success': True,
+        'stats': result,
+        'count': len(result)
+    }
+    if warning:
+        response['warning'] = warning
+    
+    return jsonify(response), 200
+
+
+def is_admin(player):
+    """Проверка что игрок - админ (Steam ID в ADMIN_STEAM_IDS)"""
+    return player.steam_id in current_app.config.get('ADMIN_STEAM_IDS', [])
+
+
+@api.route('/stats/cache', methods=['GET'])
+@require_auth
+def get_stats_cache_info():
+    """Счётчики кэша статистики (только для админов)"""
+    if not is_admin(request.current_player):
+        return jsonify({
+            'success': False,
+            'error': 'Недостаточно прав'
+        }), 403
+    
+    return jsonify({
+        'success': True,
+        'cache': stats_cache.stats()
+    }), 200
+
+
+@api.route('/stats/cache', methods=['DELETE'])
+@require_auth
+def clear_stats_cache():
+    """Очистить кэш статистики (только для админов)"""
+    if not is_admin(request.current_player):
+        return jsonify({
+            'success': False,
+            'error': 'Недостаточно прав'
+        }), 403
+    
+    return jsonify({
+        'success': True,
+        'invalidated': stats_cache.clear()
+    }), 200
+
+
+@api.route('/stats/cache/<steam_id>', methods=['DELETE'])
+@require_auth
+def invalidate_player_stats(steam_id):
+    """Сбросить кэш статистики игрока (только для админов)"""
+    if not is_admin(request.current_player):
+        return jsonify({
+            'success': False,
+            'error': 'Недостаточно прав'
+        }), 403
+    
+    return jsonify({
+        'success': True,
+        'invalidated': stats_cache.invalidate_where(
+            lambda key: key == steam_id or (isinstance(key, tuple) and key[0] == steam_id)
+        )
+    }), 200
+
+
+# Колонки CSV-экспорта (вложенные списки topWeapons/topRoles есть только в NDJSON)
+EXPORT_CSV_COLUMNS = (
+    'steamId', 'playerName', 'kills', 'deaths', 'kd', 'revives', 'teamkills',
+    'matches', 'wins', 'winRate', 'avgKills', 'playtimeMinutes', 'commanderMatches',
+    'heavyVehicleTimeMs', 'heliTimeMs', 'vehicleKills', 'knifeKills', 'artilleryKills',
+    'infantryKills', 'rankGroupId', 'rankScore'
+)
+
+
+def _export_ndjson(users):
+    for user in users:
+        yield current_app.json.dumps(build_player_stats(user)) + '\n'
+
+
+def _export_csv(users, flush_every=500):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    
+    for count, user in enumerate(users, 1):
+        stats = build_player_stats(user)
+        rank = stats.get('rank') or {}
+        stats['rankGroupId'] = rank.get('groupId')
+        stats['rankScore'] = rank.get('score')
+        writer.writerow([stats.get(column, '') for column in EXPORT_CSV_COLUMNS])
         
+        if count % flush_every == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    yield buffer.getvalue()
+
+
+@api.route('/stats/export', methods=['GET'])
+@require_auth
+def export_stats():
+    """
+    Потоковый экспорт статистики всех игроков (только для админов)
+    
+    Query params:
+        format: ndjson (default) | csv
+        fields: как в GET /stats/<steam_id>
+    
+    Каждый документ проходит ту же обработку, что и GET /stats/<steam_id>;
+    строки отдаются генератором по мере чтения курсора, память не растёт.
+    """
+    if not is_admin(request.current_player):
+        return jsonify({
+            'success': False,
+            'error': 'Недостаточно прав'
+        }), 403
+    
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({
+            'success': False,
+            'error': 'format должен быть ndjson или csv'
+        }), 400
+    
+    try:
+        sections = parse_stats_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    try:
+        collection = get_collection('mainstats')
+    except RuntimeError:
         return jsonify({
+            'success': False,
+            'error': 'MongoDB not configured'
+        }), 503
+    
+    users = collection.find({}, stats_projection(sections)).batch_size(
+        current_app.config.get('STATS_EXPORT_BATCH_SIZE', 1000)
+    )
+    
+    if export_format == 'csv':
+        body, mimetype = _export_csv(users), 'text/csv'
+    else:
+        body, mimetype = _export_ndjson(users), 'application/x-ndjson'
+    
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=player_stats.{export_format}'
+    return response
+
+
+@api.route('/stats/search/<player_name>', methods=['GET'])
+def search_player_by_name(player_name):
+    """Поиск игрока по имени (префикс имени или слова в имени, подстрока от 3 символов)"""
+    try:
+        result = player_search.search(player_name)
+        
+        response = {
             'success': True,
-            'players': results,
-            'count': len(results)
-        }), 200
+            'players': result['players'],
+            'count': len(result['players'])
+        }
+        if not result['complete']:
+            response['partial'] = True
         
+        return jsonify(response), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except RuntimeError:
         return jsonify({
             'success': False,
@@ -207,59 +425,89 @@ def search_player_by_name(player_name):
 
 @api.route('/stats/leaderboard', methods=['GET'])
 def get_leaderboard():
-    """Получить топ-10 игроков по убийствам"""
+    """
+    Таблица лидеров из материализованного снимка
+    
+    Параметры:
+        sortBy: kills (default), deaths, kd, winRate, revives, playtime, matches, wins
+        minMatches: порог матчей (одно из LEADERBOARD_MATCH_THRESHOLDS)
+        limit: размер страницы (default 10, максимум LEADERBOARD_MAX_LIMIT)
+        cursor: значение next из предыдущей страницы
+    """
     try:
-        from flask import request
+        sort_by = request.args.get('sortBy', 'kills')
+        if sort_by not in SORT_FIELDS:
+            return jsonify({
+                'success': False,
+                'error': f'Недопустимое значение sortBy. Разрешены: {", ".join(SORT_FIELDS)}'
+            }), 400
         
-        # Параметры сортировки
-        sort_by = request.args.get('sortBy', 'kills')  # kills, kd, matches
-        limit = min(int(request.args.get('limit', 10)), 50)  # максимум 50
+        max_limit = current_app.config.get('LEADERBOARD_MAX_LIMIT', 100)
+        try:
+            limit = max(1, min(int(request.args.get('limit', 10)), max_limit))
+            min_matches = int(request.args.get('minMatches', leaderboard.default_min_matches_for(sort_by)))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'limit и minMatches должны быть числами'
+            }), 400
         
-        collection = get_collection('mainstats')
+        if min_matches not in leaderboard.match_thresholds:
+            return jsonify({
+                'success': False,
+                'error': f'Недопустимое значение minMatches. Разрешены: {", ".join(map(str, leaderboard.match_thresholds))}'
+            }), 400
         
-        # Определяем поле для сортировки
-        sort_field = sort_by if sort_by in ['kills', 'deaths', 'matches', 'wins'] else 'kills'
+        after = None
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                data = decode_cursor(cursor)
+                if data.get('s') != sort_by or data.get('m') != min_matches:
+                    raise CursorError('Курсор от другой сортировки')
+                after = (data['v'], data['id'])
+            except (CursorError, KeyError):
+                return jsonify({
+                    'success': False,
+                    'error': 'Невалидный курсор'
+                }), 400
         
-        # Безопасное извлечение числовых полей
-        def safe_int(value, default=0):
-            if isinstance(value, (int, float)):
-                return int(value)
-            elif isinstance(value, dict):
-                for v in value.values():
-                    if isinstance(v, (int, float)):
-                        return int(v)
-            return default
+        snapshot = leaderboard.get_snapshot()
+        if snapshot is None:
+            # Первый снимок воркера собирается в фоне - запрос не ждёт полного скана mainstats
+            response = jsonify({
+                'success': False,
+                'error': 'Таблица лидеров строится, повторите запрос позже',
+                'warming': True
+            })
+            response.headers['Retry-After'] = str(WARMING_RETRY_AFTER)
+            return response, 503
         
-        # Получаем топ игроков
-        users = collection.find(
-            {},
-            {'_id': 1, 'playerName': 1, 'kills': 1, 'deaths': 1, 'matches': 1, 'wins': 1}
-        ).sort(sort_field, -1).limit(limit)
+        page, total = snapshot.page(sort_by, min_matches, limit, after)
         
-        leaderboard = []
-        for idx, user in enumerate(users, 1):
-            kills = safe_int(user.get('kills', 0))
-            deaths = safe_int(user.get('deaths', 0))
-            matches = safe_int(user.get('matches', 0))
-            wins = safe_int(user.get('wins', 0))
-            
-            leaderboard.append({
-                'rank': idx,
-                'steamId': user['_id'],
-                'playerName': user.get('playerName', 'Unknown'),
-                'kills': kills,
-                'deaths': deaths,
-                'kd': calculate_kd_ratio(kills, deaths),
-                'matches': matches,
-                'wins': wins,
-                'winRate': round((wins / matches) * 100, 1) if matches > 0 else 0
+        leaderboard_rows = snapshot.rows([index for _, index in page])
+        for (rank, _), row in zip(page, leaderboard_rows):
+            row['rank'] = rank
+        
+        next_cursor = None
+        if page and page[-1][0] < total:
+            last_index = page[-1][1]
+            next_cursor = encode_cursor({
+                's': sort_by,
+                'm': min_matches,
+                'v': snapshot.value(sort_by, last_index),
+                'id': snapshot.steam_ids[last_index]
             })
         
         return jsonify({
             'success': True,
-            'leaderboard': leaderboard,
+            'leaderboard': leaderboard_rows,
             'sortedBy': sort_by,
-            'count': len(leaderboard)
+            'minMatches': min_matches,
+            'count': len(leaderboard_rows),
+            'total': total,
+            'next': next_cursor,
+            'snapshotAt': snapshot.built_at
         }), 200
         
     except RuntimeError:
@@ -276,24 +524,26 @@ def get_leaderboard():
 
 @api.route('/stats/ranks', methods=['GET'])
 def get_rank_config():
-    """Получить конфигурацию ранговой системы"""
+    """
+    Получить конфигурацию ранговой системы
+    
+    Ответ кэшируется в памяти (RANK_CONFIG_TTL) и отдаётся со strong ETag:
+    при совпадении If-None-Match возвращается 304 без тела.
+    """
     try:
-        config_collection = get_collection('configs')
-        config = config_collection.find_one({'type': 'score'})
+        entry = rank_config_cache.get()
         
-        if not config:
+        if entry is None:
             return jsonify({
                 'success': False,
                 'error': 'Rank configuration not found'
             }), 404
         
-        return jsonify({
-            'success': True,
-            'rankConfig': {
-                'icons': config.get('icons', {}),
-                'groups': list(config.get('icons', {}).keys())
-            }
-        }), 200
+        body, etag = entry
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.no_cache = True  # клиент всегда переспрашивает, но с If-None-Match
+        return response.make_conditional(request)
         
     except RuntimeError:
         return jsonify({
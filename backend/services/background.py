@@ -0,0 +1,121 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from models import db, TaskRun
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Фоновая задача, выполняемая в daemon-потоке с заданным интервалом
+    
+    Поток создаётся лениво через ensure_running() в том процессе, который
+    его вызвал, поэтому задача безопасна для gunicorn (fork после импорта app):
+    после fork поток родителя не существует и запускается заново в воркере.
+    """
+    
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        
+        self.runs = 0
+        self.failures = 0
+        self.last_run_at = None
+        self.last_duration = None
+        self.last_error = None
+    
+    def ensure_running(self):
+        """Запустить поток в текущем процессе, если он ещё не запущен"""
+        if not self.interval or self.interval <= 0:
+            return
+        
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+    
+    def run_once(self):
+        """Выполнить задачу синхронно. Возвращает True при успехе"""
+        with self._run_lock:
+            started = time.monotonic()
+            try:
+                self.func()
+                self.last_error = None
+                return True
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                logger.warning(f"Background task {self.name} failed: {e}")
+                return False
+            finally:
+                self.runs += 1
+                self.last_run_at = time.time()
+                self.last_duration = time.monotonic() - started
+    
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            self.run_once()
+    
+    def status(self):
+        """Состояние задачи"""
+        return {
+            'name': self.name,
+            'interval': self.interval,
+            'running': self._pid == os.getpid() and self._thread is not None and self._thread.is_alive(),
+            'runs': self.runs,
+            'failures': self.failures,
+            'lastRunAt': self.last_run_at,
+            'lastDuration': round(self.last_duration, 3) if self.last_duration is not None else None,
+            'lastError': self.last_error
+        }
+
+
+@contextmanager
+def advisory_lock(key):
+    """
+    Advisory lock PostgreSQL на отдельном соединении; yield False если занят
+    
+    Фоновые задачи с общим результатом в БД берут его, чтобы задачу выполнял
+    один воркер. Вне PostgreSQL (разработка) блокировка не нужна.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        yield True
+        return
+    
+    with db.engine.connect() as connection:
+        locked = connection.execute(db.text('SELECT pg_try_advisory_lock(:key)'), {'key': key}).scalar()
+        try:
+            yield locked
+        finally:
+            if locked:
+                connection.execute(db.text('SELECT pg_advisory_unlock(:key)'), {'key': key})
+
+
+def last_run_at(name):
+    """Время последнего завершённого запуска задачи name любым воркером (или None)"""
+    run = db.session.get(TaskRun, name)
+    return run.finished_at if run is not None else None
+
+
+def record_run(name, result=None, finished_at=None):
+    """Отметить завершённый запуск задачи (commit)"""
+    db.session.merge(TaskRun(name=name, finished_at=finished_at or datetime.utcnow(), result=result))
+    db.session.commit()
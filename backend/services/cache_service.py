@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def json_size(value):
+    """Приблизительный размер значения в байтах (по длине JSON)"""
+    return len(json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str))
+
+
+class TTLCache:
+    """
+    Потокобезопасный LRU-кэш с TTL и ограничением по памяти
+    
+    Записи вытесняются по давности использования, когда превышен лимит
+    количества записей или суммарного размера, и истекают через ttl секунд.
+    ttl=0 отключает кэш.
+    """
+    
+    def __init__(self, ttl=60, max_entries=5000, max_bytes=32 * 1024 * 1024, sizeof=json_size):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def configure(self, ttl=None, max_entries=None, max_bytes=None):
+        """Изменить параметры кэша (очищает кэш)"""
+        with self._lock:
+            if ttl is not None:
+                self.ttl = ttl
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._entries.clear()
+            self._bytes = 0
+    
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+    
+    def get(self, key):
+        """Получить значение или None (промах / истёк TTL)"""
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, size, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key, value):
+        """Сохранить значение (слишком большие значения не кэшируются)"""
+        if not self.enabled:
+            return
+        
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+    
+    def invalidate(self, key):
+        """Удалить запись. Возвращает True если запись была"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._bytes -= entry[1]
+            return True
+    
+    def invalidate_where(self, predicate):
+        """Удалить все записи, ключ которых удовлетворяет predicate. Возвращает количество"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)[1]
+            return len(keys)
+    
+    def clear(self):
+        """Очистить кэш (счётчики сохраняются)"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return count
+    
+    def stats(self):
+        """Счётчики кэша"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'maxEntries': self.max_entries,
+                'maxBytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+# Кэш вычисленной статистики игроков
+# (ключ - Steam ID для полной статистики, (Steam ID, секции) для частичной)
+stats_cache = TTLCache()
+
+
+def init_stats_cache(app):
+    """Настройка кэша статистики из конфигурации приложения"""
+    stats_cache.configure(
+        ttl=app.config.get('STATS_CACHE_TTL', 60),
+        max_entries=app.config.get('STATS_CACHE_MAX_ENTRIES', 5000),
+        max_bytes=app.config.get('STATS_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+    )
+    return stats_cache
@@ -0,0 +1,72 @@
+"""
+Денормализованные поля кланов: member_count и owner_player_id
+
+Каждый путь, меняющий состав клана или роли, вызывает sync_clan_summary до commit,
+поэтому поля обновляются в той же транзакции. Команда flask repair-clan-summary
+пересчитывает поля всех кланов (backfill после миграции, починка расхождений).
+"""
+import click
+
+from models import db, Clan, ClanMember
+
+
+def _summary_values():
+    """Пересчёт полей коррелированными подзапросами по clan_members"""
+    member_count = db.select(db.func.count(ClanMember.id)).where(
+        ClanMember.clan_id == Clan.id
+    ).scalar_subquery()
+    owner_player_id = db.select(ClanMember.player_id).where(
+        ClanMember.clan_id == Clan.id,
+        ClanMember.role == 'owner'
+    ).order_by(ClanMember.joined_at).limit(1).scalar_subquery()
+    return member_count, owner_player_id
+
+
+def sync_clan_summary(clan_id):
+    """
+    Пересчитать member_count и owner_player_id клана в текущей транзакции
+    
+    Ожидающие изменения сессии сбрасываются (autoflush) до UPDATE; commit - у вызывающего.
+    Строка клана блокируется до пересчёта: в READ COMMITTED параллельная транзакция
+    ждёт commit первой, и её UPDATE видит участников, добавленных первой.
+    """
+    db.session.query(Clan.id).filter_by(id=clan_id).with_for_update().first()
+    
+    member_count, owner_player_id = _summary_values()
+    db.session.execute(
+        db.update(Clan).where(Clan.id == clan_id).values(
+            member_count=member_count,
+            owner_player_id=owner_player_id
+        ).execution_options(synchronize_session='fetch')
+    )
+
+
+def repair_clan_summary():
+    """
+    Пересчитать поля всех кланов, где они разошлись с clan_members
+    
+    Returns:
+        int: количество исправленных кланов
+    """
+    member_count, owner_player_id = _summary_values()
+    result = db.session.execute(
+        db.update(Clan).where(db.or_(
+            Clan.member_count != member_count,
+            Clan.owner_player_id.is_distinct_from(owner_player_id)
+        )).values(
+            member_count=member_count,
+            owner_player_id=owner_player_id
+        ).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def init_clan_commands(app):
+    """CLI-команды обслуживания кланов"""
+    
+    @app.cli.command('repair-clan-summary')
+    def repair_clan_summary_command():
+        """Пересчитать member_count и owner_player_id всех кланов"""
+        repaired = repair_clan_summary()
+        click.echo(f'Clans repaired: {repaired}')
@@ -0,0 +1,126 @@
+"""
+Сжатие JSON-ответов (gzip, brotli если установлен пакет brotli)
+
+Подключается одним after_request на приложение, поэтому покрывает все blueprints.
+Кодировка выбирается по Accept-Encoding (с учётом q-значений), ответы меньше
+порога не сжимаются. Для ответов с ETag сжатое тело кэшируется по (кодировка, ETag),
+повторный запрос того же представления не сжимает тело заново.
+"""
+import gzip
+
+from flask import request
+
+from services.cache_service import TTLCache
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = frozenset({'application/json'})
+
+
+def parse_accept_encoding(header):
+    """Accept-Encoding -> {кодировка: q}"""
+    accepted = {}
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+class ResponseCompressor:
+    """Настройки и кэш сжатых тел"""
+    
+    def __init__(self):
+        self.enabled = True
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_quality = 5
+        self.cache = TTLCache(ttl=300, max_entries=256, max_bytes=16 * 1024 * 1024, sizeof=len)
+    
+    def encodings(self):
+        """Поддерживаемые кодировки в порядке предпочтения"""
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+    
+    def negotiate(self, header):
+        """Лучшая кодировка из Accept-Encoding или None"""
+        accepted = parse_accept_encoding(header)
+        wildcard = accepted.get('*', 0.0)
+        best = None
+        best_q = 0.0
+        for encoding in self.encodings():
+            q = accepted.get(encoding, wildcard)
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+    
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+    
+    def process(self, response):
+        """after_request: сжать ответ, если клиент и ответ это допускают"""
+        # 304 и прочие ответы без тела, потоковые ответы (экспорт) и файлы не трогаем
+        if (
+            not self.enabled
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or not 200 <= response.status_code < 300
+            or response.status_code in (204, 206)
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+        ):
+            return response
+        
+        # Представление зависит от Accept-Encoding, даже если этот ответ не сжат
+        response.vary.add('Accept-Encoding')
+        
+        encoding = self.negotiate(request.headers.get('Accept-Encoding'))
+        if encoding is None or response.content_length is None or response.content_length < self.min_size:
+            return response
+        
+        etag, weak = response.get_etag()
+        cache_key = (encoding, request.path, etag) if etag and request.method == 'GET' else None
+        body = self.cache.get(cache_key) if cache_key else None
+        if body is None:
+            body = self.compress(response.get_data(), encoding)
+            if cache_key:
+                self.cache.set(cache_key, body)
+        
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag and not weak:
+            # Сжатое тело побайтно отличается от исходного: ETag становится слабым,
+            # If-None-Match сравнивается слабо, поэтому 304 продолжает работать
+            response.set_etag(etag, weak=True)
+        return response
+
+
+response_compressor = ResponseCompressor()
+
+
+def init_compression(app):
+    """Сжатие ответов всех blueprints приложения"""
+    response_compressor.enabled = app.config.get('COMPRESSION_ENABLED', True)
+    response_compressor.min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+    response_compressor.gzip_level = app.config.get('COMPRESSION_GZIP_LEVEL', 6)
+    response_compressor.brotli_quality = app.config.get('COMPRESSION_BROTLI_QUALITY', 5)
+    response_compressor.cache.configure(
+        ttl=app.config.get('COMPRESSION_CACHE_TTL', 300),
+        max_bytes=app.config.get('COMPRESSION_CACHE_MAX_BYTES', 16 * 1024 * 1024)
+    )
+    
+    app.after_request(response_compressor.process)
+    return response_compressor
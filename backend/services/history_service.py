@@ -0,0 +1,185 @@
+"""
+История статистики игроков
+
+mainstats хранит только итоговые счётчики. Периодическое снятие сравнивает
+снимок таблицы лидеров с предыдущими итогами (stat_totals) и пишет в stat_deltas
+только прирост изменившихся игроков. История игрока за окно - один range scan
+по первичному ключу (steam_id, captured_at).
+"""
+import logging
+import re
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from models import db, StatTotals, StatDelta
+from services.background import PeriodicTask, advisory_lock
+from services.leaderboard_service import leaderboard
+from services.stats_service import calculate_kd_ratio
+
+logger = logging.getLogger(__name__)
+
+# Поля stat_totals / stat_deltas = колонки снимка таблицы лидеров
+HISTORY_FIELDS = ('kills', 'deaths', 'wins', 'matches', 'revives', 'playtime')
+
+HISTORY_LOCK_KEY = 0x5a52_4201  # pg advisory lock: одно снятие на все воркеры
+
+WINDOW_RE = re.compile(r'^(\d+)([hd])$')
+
+
+def parse_window(value, max_days=180):
+    """
+    Окно истории: '24h', '7d', '30d' ...
+    
+    Raises:
+        ValueError: неверный формат или окно больше max_days
+    """
+    match = WINDOW_RE.match(value or '')
+    if not match:
+        raise ValueError('window должен быть вида 24h или 7d')
+    
+    amount, unit = int(match.group(1)), match.group(2)
+    window = timedelta(hours=amount) if unit == 'h' else timedelta(days=amount)
+    if window <= timedelta(0) or window > timedelta(days=max_days):
+        raise ValueError(f'window должен быть от 1h до {max_days}d')
+    return window
+
+
+def capture_stat_deltas(snapshot, batch_size=5000, now=None):
+    """
+    Сравнить снимок с stat_totals и записать дельты
+    
+    Новые игроки получают только базовую строку; уменьшившиеся счётчики
+    (сброс статистики) переписывают базу без дельты.
+    
+    Returns:
+        dict: {'players', 'changed', 'new', 'resets'}
+    """
+    now = now or datetime.utcnow()
+    columns = [snapshot.columns[field] for field in HISTORY_FIELDS]
+    totals_columns = [getattr(StatTotals, field) for field in HISTORY_FIELDS]
+    result = {'players': len(snapshot), 'changed': 0, 'new': 0, 'resets': 0}
+    
+    for start in range(0, len(snapshot), batch_size):
+        steam_ids = snapshot.steam_ids[start:start + batch_size]
+        baseline = {
+            row[0]: tuple(row[1:])
+            for row in db.session.query(StatTotals.steam_id, *totals_columns).filter(
+                StatTotals.steam_id.in_(steam_ids)
+            )
+        }
+        
+        inserts = []
+        updates = []
+        deltas = []
+        chunk = zip(*(np.asarray(column[start:start + batch_size]).tolist() for column in columns))
+        for steam_id, current in zip(steam_ids, chunk):
+            previous = baseline.get(steam_id)
+            if previous == current:
+                continue
+            
+            row = dict(zip(HISTORY_FIELDS, current), steam_id=steam_id, captured_at=now)
+            if previous is None:
+                inserts.append(row)
+                result['new'] += 1
+                continue
+            
+            updates.append(row)
+            diff = [value - old for value, old in zip(current, previous)]
+            if min(diff) < 0:
+                result['resets'] += 1
+                continue
+            
+            deltas.append(dict(zip(HISTORY_FIELDS, diff), steam_id=steam_id, captured_at=now))
+        
+        if inserts:
+            db.session.execute(db.insert(StatTotals), inserts)
+        if updates:
+            db.session.execute(db.update(StatTotals), updates)
+        if deltas:
+            db.session.execute(db.insert(StatDelta), deltas)
+            result['changed'] += len(deltas)
+        db.session.commit()
+    
+    return result
+
+
+def get_history(steam_id, window, now=None):
+    """Дельты игрока за окно (по возрастанию времени) и их сумма"""
+    since = (now or datetime.utcnow()) - window
+    series = StatDelta.query.filter(
+        StatDelta.steam_id == steam_id,
+        StatDelta.captured_at >= since
+    ).order_by(StatDelta.captured_at).all()
+    
+    totals = {field: sum(getattr(delta, field) for delta in series) for field in HISTORY_FIELDS}
+    summary = {
+        'kills': totals['kills'],
+        'deaths': totals['deaths'],
+        'kd': calculate_kd_ratio(totals['kills'], totals['deaths']),
+        'wins': totals['wins'],
+        'matches': totals['matches'],
+        'winRate': round((totals['wins'] / totals['matches']) * 100, 1) if totals['matches'] > 0 else 0,
+        'revives': totals['revives'],
+        'playtimeMinutes': totals['playtime']
+    }
+    return since, summary, [delta.to_dict() for delta in series]
+
+
+class StatsHistory:
+    """Периодическое снятие дельт в фоновом потоке воркера"""
+    
+    def __init__(self):
+        self.app = None
+        self.batch_size = 5000
+        self.retention_days = 180
+        self.last_result = None
+        self.task = PeriodicTask('stats-history', self.run, 3600)
+    
+    def run(self):
+        with self.app.app_context():
+            try:
+                self._run()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+    
+    def _run(self):
+        with advisory_lock(HISTORY_LOCK_KEY) as locked:
+            if not locked:
+                return
+            
+            # Другой воркер уже снял историю в этом интервале
+            last = db.session.query(db.func.max(StatDelta.captured_at)).scalar()
+            if last is not None and datetime.utcnow() - last < timedelta(seconds=self.task.interval / 2):
+                return
+            
+            snapshot = leaderboard.load_snapshot()
+            self.last_result = capture_stat_deltas(snapshot, self.batch_size)
+            
+            cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+            self.last_result['expired'] = StatDelta.query.filter(StatDelta.captured_at < cutoff).delete(
+                synchronize_session=False
+            )
+            db.session.commit()
+        
+        logger.info(f"Stats history captured: {self.last_result}")
+
+
+stats_history = StatsHistory()
+
+
+def init_stats_history(app):
+    """Настройка снятия истории; поток стартует с первым запросом воркера"""
+    stats_history.app = app
+    stats_history.batch_size = app.config.get('STATS_HISTORY_BATCH_SIZE', 5000)
+    stats_history.retention_days = app.config.get('STATS_HISTORY_RETENTION_DAYS', 180)
+    stats_history.task.interval = app.config.get('STATS_HISTORY_INTERVAL', 3600)
+    
+    @app.before_request
+    def ensure_stats_history():
+        stats_history.task.ensure_running()
+    
+    return stats_history
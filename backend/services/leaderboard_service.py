@@ -0,0 +1,262 @@
+"""
+Материализованная таблица лидеров
+
+Снимок всей коллекции mainstats периодически пересобирается в фоне одним
+потоковым проходом в NumPy-колонки. Для каждой сортировки хранится готовый
+порядок индексов (np.lexsort), поэтому чтение страницы - это бинарный поиск
+курсора + срез.
+
+Снимок живёт в памяти воркера: каждый воркер собирает и пересобирает свой.
+Запросы не ждут сборки - пока первого снимка нет, get_snapshot возвращает None.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+
+from services.background import PeriodicTask
+from services.mongo_service import get_collection
+from services.stats_service import PLAYER_ROW_FIELDS, load_stat_columns
+
+logger = logging.getLogger(__name__)
+
+# Поля, по которым можно сортировать (параметр sortBy)
+SORT_FIELDS = ('kills', 'deaths', 'kd', 'winRate', 'revives', 'playtime', 'matches', 'wins')
+
+# Для относительных показателей без порога матчей в топе окажутся новички с 1 матчем
+RATE_SORT_FIELDS = ('kd', 'winRate')
+
+# Пауза между попытками фоновой сборки первого снимка после ошибки (секунды)
+WARM_UP_RETRY = 30
+
+# Retry-After ответа 503, пока первый снимок воркера строится (секунды)
+WARMING_RETRY_AFTER = 10
+
+# Колонки снимка для полей строки после steamId и playerName (порядок PLAYER_ROW_FIELDS)
+ROW_COLUMNS = ('kills', 'deaths', 'kd', 'matches', 'wins', 'winRate', 'revives', 'playtime')
+
+
+class LeaderboardSnapshot:
+    """Колоночный снимок статистики всех игроков (NumPy) + порядки сортировки"""
+    
+    def __init__(self, steam_ids, names, columns, built_at):
+        self.steam_ids = steam_ids
+        self.names = names
+        self.columns = {
+            field: values if field == 'scoreGroup' else np.asarray(values)
+            for field, values in columns.items()
+        }  # поле -> значения (индекс = игрок)
+        self.built_at = built_at
+        self._orders = {}
+        self._orders_lock = threading.RLock()
+        
+        # Ранг Steam ID в лексикографическом порядке - целочисленный tie-break сортировок
+        ids = np.asarray(steam_ids, dtype=str)
+        by_id = np.argsort(ids, kind='stable')
+        self._sorted_ids = ids[by_id]
+        self._by_id = by_id
+        self._id_rank = np.empty(len(ids), dtype=np.int64)
+        self._id_rank[by_id] = np.arange(len(ids))
+    
+    def __len__(self):
+        return len(self.steam_ids)
+    
+    def order(self, field, min_matches=0):
+        """
+        Индексы игроков, отсортированные по field (desc, затем Steam ID), с порогом матчей
+        
+        Returns:
+            tuple: (индексы, -значения в этом порядке) - второй массив для searchsorted
+        """
+        key = (field, min_matches)
+        order = self._orders.get(key)
+        if order is not None:
+            return order
+        
+        with self._orders_lock:
+            order = self._orders.get(key)
+            if order is not None:
+                return order
+            
+            if min_matches > 0:
+                indexes, _ = self.order(field, 0)
+                indexes = indexes[self.columns['matches'][indexes] >= min_matches]
+            else:
+                indexes = np.lexsort((self._id_rank, -self.columns[field]))
+            
+            order = (indexes, -self.columns[field][indexes])
+            self._orders[key] = order
+            return order
+    
+    def page(self, field, min_matches, limit, after=None):
+        """
+        Страница таблицы лидеров (keyset-пагинация)
+        
+        Args:
+            after: tuple (value, steam_id) последней строки предыдущей страницы
+        
+        Returns:
+            tuple: (список (rank, index), total)
+        """
+        indexes, negated = self.order(field, min_matches)
+        start = 0
+        if after is not None:
+            value, steam_id = after
+            # Строки с тем же значением упорядочены по рангу Steam ID
+            low = int(np.searchsorted(negated, -value, side='left'))
+            high = int(np.searchsorted(negated, -value, side='right'))
+            id_bound = np.searchsorted(self._sorted_ids, steam_id, side='right')
+            start = low + int(np.searchsorted(self._id_rank[indexes[low:high]], id_bound, side='left'))
+        
+        end = min(start + limit, len(indexes))
+        return [(position + 1, int(indexes[position])) for position in range(start, end)], len(indexes)
+    
+    def indexes_of(self, steam_ids):
+        """Индексы игроков по Steam ID: {steam_id: индекс}, отсутствующие в снимке пропускаются"""
+        if not len(self._sorted_ids) or not steam_ids:
+            return {}
+        ids = np.asarray(steam_ids, dtype=str)
+        positions = np.minimum(np.searchsorted(self._sorted_ids, ids), len(self._sorted_ids) - 1)
+        found = self._sorted_ids[positions] == ids
+        return {
+            steam_id: int(self._by_id[position])
+            for steam_id, position, ok in zip(steam_ids, positions.tolist(), found.tolist())
+            if ok
+        }
+    
+    def value(self, field, index):
+        """Значение поля игрока (Python-скаляр, для курсора)"""
+        return self.columns[field][index].item()
+    
+    def rows(self, indexes):
+        """
+        Строки игроков в формате API (PLAYER_ROW_FIELDS, как PlayerStats.to_row)
+        
+        Колонки переводятся в Python-скаляры одним tolist() на страницу,
+        а не по .item() на каждое значение.
+        """
+        indexes = np.asarray(indexes, dtype=np.int64)
+        values = zip(*(self.columns[field][indexes].tolist() for field in ROW_COLUMNS))
+        return [
+            dict(zip(PLAYER_ROW_FIELDS, (self.steam_ids[i], self.names[i], *row)))
+            for i, row in zip(indexes.tolist(), values)
+        ]
+
+
+def build_snapshot(collection, batch_size=5000):
+    """Собрать снимок одним потоковым проходом по mainstats (см. load_stat_columns)"""
+    stats = load_stat_columns(collection, batch_size)
+    columns = {
+        'kills': stats.kills,
+        'deaths': stats.deaths,
+        'kd': stats.kd,
+        'winRate': stats.win_rate,
+        'revives': stats.revives,
+        'playtime': stats.time,
+        'matches': stats.matches,
+        'wins': stats.wins,
+        'score': stats.scores,
+        'scoreGroup': stats.score_groups
+    }
+    return LeaderboardSnapshot(stats.steam_ids, stats.names, columns, time.time())
+
+
+class Leaderboard:
+    """Хранит текущий снимок и пересобирает его в фоне"""
+    
+    def __init__(self):
+        self.snapshot = None
+        self.batch_size = 5000
+        self.default_min_matches = 10
+        self.match_thresholds = (0, 10, 50, 100)
+        self.task = PeriodicTask('leaderboard-refresh', self.refresh, 300)
+        self._build_lock = threading.Lock()
+        self._listeners = []
+        self._warm_lock = threading.Lock()
+        self._warming = None
+        self._warm_failed_at = None
+    
+    def configure(self, interval=None, batch_size=None, default_min_matches=None, match_thresholds=None):
+        if interval is not None:
+            self.task.interval = interval
+        if batch_size is not None:
+            self.batch_size = batch_size
+        if default_min_matches is not None:
+            self.default_min_matches = default_min_matches
+        if match_thresholds is not None:
+            self.match_thresholds = tuple(sorted(set(match_thresholds) | {0}))
+    
+    def refresh(self):
+        """Пересобрать снимок и прогреть порядки сортировки по умолчанию"""
+        snapshot = build_snapshot(get_collection('mainstats'), self.batch_size)
+        for field in SORT_FIELDS:
+            snapshot.order(field, self.default_min_matches_for(field))
+        self.snapshot = snapshot
+        logger.info(f"Leaderboard snapshot rebuilt: {len(snapshot)} players")
+        
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.warning(f"Leaderboard listener {listener!r} failed: {e}")
+    
+    def add_listener(self, listener):
+        """Вызывать listener(snapshot) после каждой пересборки (в потоке пересборки)"""
+        self._listeners.append(listener)
+    
+    def get_snapshot(self):
+        """Текущий снимок или None, пока первый собирается в фоне (для запросов)"""
+        if self.snapshot is None:
+            self.warm_up()
+        else:
+            self.task.ensure_running()
+        return self.snapshot
+    
+    def load_snapshot(self):
+        """Текущий снимок; если его нет, собирается синхронно (для фоновых потоков)"""
+        self.task.ensure_running()
+        if self.snapshot is None:
+            with self._build_lock:
+                if self.snapshot is None:
+                    self.refresh()
+        return self.snapshot
+    
+    def warm_up(self):
+        """Собрать первый снимок в фоне, не блокируя текущий запрос"""
+        self.task.ensure_running()
+        if self.snapshot is not None:
+            return
+        with self._warm_lock:
+            if self._warming is not None and self._warming.is_alive():
+                return
+            # После неудачи не чаще раза в WARM_UP_RETRY секунд (иначе поток на каждый запрос)
+            if self._warm_failed_at is not None and time.monotonic() - self._warm_failed_at < WARM_UP_RETRY:
+                return
+            self._warming = threading.Thread(target=self._warm, name='leaderboard-warmup', daemon=True)
+            self._warming.start()
+    
+    def _warm(self):
+        try:
+            self.load_snapshot()
+            self._warm_failed_at = None
+        except Exception as e:
+            self._warm_failed_at = time.monotonic()
+            logger.warning(f"Leaderboard warm-up failed: {e}")
+    
+    def default_min_matches_for(self, field):
+        return self.default_min_matches if field in RATE_SORT_FIELDS else 0
+
+
+leaderboard = Leaderboard()
+
+
+def init_leaderboard(app):
+    """Настройка таблицы лидеров из конфигурации приложения"""
+    leaderboard.configure(
+        interval=app.config.get('LEADERBOARD_REFRESH_INTERVAL', 300),
+        batch_size=app.config.get('LEADERBOARD_BATCH_SIZE', 5000),
+        default_min_matches=app.config.get('LEADERBOARD_MIN_MATCHES', 10),
+        match_thresholds=app.config.get('LEADERBOARD_MATCH_THRESHOLDS', (0, 10, 50, 100))
+    )
+    return leaderboard
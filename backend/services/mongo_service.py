@@ -1,72 +1,312 @@
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo import MongoClient, monitoring
 import logging
+import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
-# Global MongoDB client (singleton pattern)
+
+class MongoUnavailable(RuntimeError):
+    """MongoDB не настроен или circuit breaker открыт - запрос отклоняется сразу"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker для MongoDB
+    
+    closed - запросы идут в MongoDB; после threshold ошибок подряд breaker открывается.
+    open - get_collection сразу бросает MongoUnavailable. Фоновые heartbeat'ы драйвера
+    продолжают проверять сервер; первый успешный heartbeat после cooldown секунд
+    закрывает breaker.
+    
+    Учитываются только серверы, которые обслуживают запросы (read preference по
+    умолчанию - primary): успехи - heartbeat'ы сервера в роли primary/standalone/mongos,
+    ошибки - heartbeat'ы сервера, который последним был primary или отдавал соединения
+    запросам (server). Пока такой сервер неизвестен, считаются ошибки любого сервера.
+    Heartbeat'ы secondary и arbiter'ов breaker не закрывают и не открывают.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    
+    def __init__(self, threshold=3, cooldown=10):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self.last_error = None
+        self.server = None
+    
+    def allow(self):
+        return self.state == self.CLOSED
+    
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.CLOSED
+                self.opened_at = None
+                logger.info("MongoDB circuit breaker closed")
+    
+    def record_failure(self, error):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            if self.state == self.CLOSED and self.consecutive_failures >= self.threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.trips += 1
+                logger.warning(f"MongoDB circuit breaker opened after {self.consecutive_failures} failures: {error}")
+    
+    def status(self):
+        return {
+            'state': self.state,
+            'consecutiveFailures': self.consecutive_failures,
+            'threshold': self.threshold,
+            'cooldown': self.cooldown,
+            'openFor': round(time.monotonic() - self.opened_at, 1) if self.opened_at is not None else None,
+            'trips': self.trips,
+            'lastError': self.last_error,
+            'server': '%s:%s' % self.server if self.server else None
+        }
+
+
+class _HeartbeatListener(monitoring.ServerHeartbeatListener):
+    """Результаты heartbeat'ов драйвера -> circuit breaker"""
+    
+    def __init__(self, breaker):
+        self.breaker = breaker
+    
+    def started(self, event):
+        pass
+    
+    def succeeded(self, event):
+        # Запросы читают с primary: живой secondary не значит, что запросы пройдут
+        if event.reply.is_writable:
+            self.breaker.record_success()
+    
+    def failed(self, event):
+        # Недоступность secondary или старого primary после выборов запросам не мешает
+        if self.breaker.server in (None, event.connection_id):
+            self.breaker.record_failure(event.reply)
+
+
+class _ServerListener(monitoring.ServerListener):
+    """Адрес текущего primary -> circuit breaker"""
+    
+    def __init__(self, breaker):
+        self.breaker = breaker
+    
+    def opened(self, event):
+        pass
+    
+    def description_changed(self, event):
+        # Новый primary после выборов: дальше считаем ошибки только его heartbeat'ов
+        if event.new_description.is_writable:
+            self.breaker.server = event.server_address
+    
+    def closed(self, event):
+        pass
+
+
+class _PoolListener(monitoring.ConnectionPoolListener):
+    """Счётчики пула соединений и ожидания checkout"""
+    
+    def __init__(self, breaker):
+        self.breaker = breaker
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.open = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_errors = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.pool_clears = 0
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+    
+    def connection_check_out_started(self, event):
+        # События checkout публикуются в потоке, который берёт соединение
+        self._local.started = time.monotonic()
+    
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.checkout_timeouts += 1
+            else:
+                self.checkout_errors += 1
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.CONN_ERROR:
+            self.breaker.record_failure('connection error on checkout')
+    
+    def connection_checked_out(self, event):
+        self.breaker.server = event.address
+        started = getattr(self._local, 'started', None)
+        wait = time.monotonic() - started if started is not None else 0.0
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+    
+    def status(self):
+        with self._lock:
+            return {
+                'open': self.open,
+                'checkedOut': self.checked_out,
+                'checkouts': self.checkouts,
+                'checkoutTimeouts': self.checkout_timeouts,
+                'checkoutErrors': self.checkout_errors,
+                'avgCheckoutWaitMs': round(self.wait_total / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+                'maxCheckoutWaitMs': round(self.wait_max * 1000, 2),
+                'poolClears': self.pool_clears
+            }
+
+
+# Настройки подключения (заполняются init_mongo)
+mongo_settings = {
+    'uri': None,
+    'db_name': 'SquadJS',
+    'max_pool_size': 50,
+    'min_pool_size': 0,
+    'wait_queue_timeout_ms': 1000,
+    'server_selection_timeout_ms': 2000,
+    'heartbeat_frequency_ms': 10000
+}
+
+breaker = CircuitBreaker()
+
+# Клиент создаётся лениво в каждом процессе (MongoClient не переживает fork)
+_client_lock = threading.Lock()
 mongo_client = None
 mongo_db = None
+_client_pid = None
+_pool_listener = None
 
 
 def init_mongo(app):
-    """Инициализация MongoDB подключения"""
-    global mongo_client, mongo_db
+    """
+    Настройка MongoDB подключения
     
-    mongo_uri = app.config.get('MONGO_URI')
-    db_name = app.config.get('MONGO_DB_NAME', 'SquadJS')
+    Соединение не открывается: клиент создаётся при первом get_collection()
+    в процессе воркера (после fork gunicorn).
+    """
+    mongo_settings.update({
+        'uri': app.config.get('MONGO_URI'),
+        'db_name': app.config.get('MONGO_DB_NAME', 'SquadJS'),
+        'max_pool_size': app.config.get('MONGO_MAX_POOL_SIZE', 50),
+        'min_pool_size': app.config.get('MONGO_MIN_POOL_SIZE', 0),
+        'wait_queue_timeout_ms': app.config.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 1000),
+        'server_selection_timeout_ms': app.config.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 2000),
+        'heartbeat_frequency_ms': app.config.get('MONGO_HEARTBEAT_FREQUENCY_MS', 10000)
+    })
+    breaker.threshold = app.config.get('MONGO_BREAKER_THRESHOLD', 3)
+    breaker.cooldown = app.config.get('MONGO_BREAKER_COOLDOWN', 10)
     
-    if not mongo_uri:
+    if not mongo_settings['uri']:
         logger.warning("MONGO_URI not configured, MongoDB features will be disabled")
-        return None
-    
-    try:
-        mongo_client = MongoClient(
-            mongo_uri,
-            serverSelectionTimeoutMS=5000,
-            connectTimeoutMS=10000,
-            socketTimeoutMS=45000,
-            maxPoolSize=50,
-            minPoolSize=10
-        )
-        
-        # Test connection
-        mongo_client.admin.command('ping')
-        mongo_db = mongo_client[db_name]
-        
-        logger.info(f"✓ Connected to MongoDB: {db_name}")
-        return mongo_db
-        
-    except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-        logger.error(f"✗ MongoDB connection failed: {e}")
-        mongo_client = None
-        mongo_db = None
-        return None
-    except Exception as e:
-        logger.error(f"✗ Unexpected MongoDB error: {e}")
-        mongo_client = None
-        mongo_db = None
-        return None
+
+
+def _connect():
+    """Создать клиент для текущего процесса"""
+    global mongo_client, mongo_db, _client_pid, _pool_listener
+    
+    _pool_listener = _PoolListener(breaker)
+    mongo_client = MongoClient(
+        mongo_settings['uri'],
+        serverSelectionTimeoutMS=mongo_settings['server_selection_timeout_ms'],
+        connectTimeoutMS=10000,
+        socketTimeoutMS=45000,
+        maxPoolSize=mongo_settings['max_pool_size'],
+        minPoolSize=mongo_settings['min_pool_size'],
+        waitQueueTimeoutMS=mongo_settings['wait_queue_timeout_ms'],
+        heartbeatFrequencyMS=mongo_settings['heartbeat_frequency_ms'],
+        event_listeners=[_HeartbeatListener(breaker), _ServerListener(breaker), _pool_listener]
+    )
+    mongo_db = mongo_client[mongo_settings['db_name']]
+    _client_pid = os.getpid()
+    logger.info(f"MongoDB client created in process {_client_pid}: {mongo_settings['db_name']}")
 
 
 def get_db():
-    """Получить экземпляр базы данных MongoDB"""
+    """Получить экземпляр базы данных MongoDB (клиент текущего процесса)"""
+    if not mongo_settings['uri']:
+        raise MongoUnavailable("MongoDB not configured")
+    
+    if _client_pid != os.getpid():
+        with _client_lock:
+            if _client_pid != os.getpid():
+                _connect()
     return mongo_db
 
 
 def get_collection(collection_name):
-    """Получить коллекцию по имени"""
-    if mongo_db is None:
-        raise RuntimeError("MongoDB not initialized")
-    return mongo_db[collection_name]
+    """
+    Получить коллекцию по имени
+    
+    Raises:
+        MongoUnavailable: MongoDB не настроен или circuit breaker открыт
+    """
+    db = get_db()
+    if not breaker.allow():
+        raise MongoUnavailable("MongoDB unavailable (circuit breaker open)")
+    return db[collection_name]
+
+
+def mongo_status():
+    """Состояние подключения для /health"""
+    status = {
+        'configured': bool(mongo_settings['uri']),
+        'connected': _client_pid == os.getpid(),
+        'maxPoolSize': mongo_settings['max_pool_size'],
+        'waitQueueTimeoutMS': mongo_settings['wait_queue_timeout_ms'],
+        'serverSelectionTimeoutMS': mongo_settings['server_selection_timeout_ms'],
+        'breaker': breaker.status()
+    }
+    if status['connected'] and _pool_listener is not None:
+        status['pool'] = _pool_listener.status()
+    return status
 
 
 def close_mongo():
     """Закрыть соединение с MongoDB"""
-    global mongo_client, mongo_db
+    global mongo_client, mongo_db, _client_pid
     
     if mongo_client:
         mongo_client.close()
         mongo_client = None
         mongo_db = None
+        _client_pid = None
         logger.info("MongoDB connection closed")
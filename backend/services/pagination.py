@@ -0,0 +1,103 @@
+"""
+Курсорная (keyset) пагинация
+
+Курсор непрозрачен для клиента: base64url(JSON). Списки из Postgres листаются по
+(created_at DESC, id DESC) - следующая страница начинается строго после последней
+строки предыдущей, поэтому запрос читает не больше limit + 1 строк по индексу
+независимо от номера страницы и размера таблицы.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from flask import current_app, request
+
+from models import db
+
+
+class PaginationError(ValueError):
+    """Невалидные параметры пагинации"""
+
+
+class CursorError(PaginationError):
+    """Невалидный курсор пагинации"""
+
+
+def encode_cursor(data):
+    """Непрозрачный курсор: base64url(JSON)"""
+    raw = json.dumps(data, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Разобрать курсор, созданный encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise CursorError('Невалидный курсор') from e
+    if not isinstance(data, dict):
+        raise CursorError('Невалидный курсор')
+    return data
+
+
+def encode_row_cursor(row):
+    """Курсор на строку модели с полями created_at и id"""
+    return encode_cursor({'t': row.created_at.isoformat(), 'id': str(row.id)})
+
+
+def decode_row_cursor(cursor):
+    """Курсор encode_row_cursor -> (created_at, id)"""
+    data = decode_cursor(cursor)
+    try:
+        return datetime.fromisoformat(data['t']), uuid.UUID(data['id'])
+    except (KeyError, TypeError, ValueError) as e:
+        raise CursorError('Невалидный курсор') from e
+
+
+def keyset_page(query, model, limit, after=None):
+    """
+    Страница query по (created_at DESC, id DESC)
+    
+    Args:
+        query: запрос без order_by
+        model: модель с колонками created_at и id
+        limit: размер страницы
+        after: (created_at, id) последней строки предыдущей страницы
+    
+    Returns:
+        tuple: (строки страницы, курсор следующей страницы или None)
+    """
+    if after is not None:
+        query = query.filter(db.tuple_(model.created_at, model.id) < db.tuple_(*after))
+    
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_row_cursor(rows[-1])
+
+
+def paginate(query, model):
+    """
+    Страница query по параметрам limit и cursor текущего запроса
+    
+    Returns:
+        tuple: (строки, limit, курсор следующей страницы или None)
+    
+    Raises:
+        PaginationError: limit не число или невалидный cursor
+    """
+    max_limit = current_app.config.get('PAGE_MAX_LIMIT', 100)
+    try:
+        limit = int(request.args.get('limit', current_app.config.get('PAGE_DEFAULT_LIMIT', 50)))
+    except ValueError as e:
+        raise PaginationError('limit должен быть числом') from e
+    limit = max(1, min(limit, max_limit))
+    
+    cursor = request.args.get('cursor')
+    after = decode_row_cursor(cursor) if cursor else None
+    
+    rows, next_cursor = keyset_page(query, model, limit, after)
+    return rows, limit, next_cursor
@@ -0,0 +1,109 @@
+"""
+Перцентили игроков по kills, K/D, винрейту и очкам группы рангов
+
+Отсортированные NumPy-массивы метрик пересобираются вместе со снимком таблицы
+лидеров (тот же единственный проекционный проход по mainstats). Перцентиль -
+два бинарных поиска (np.searchsorted) вместо count-запроса на каждый ответ.
+"""
+import math
+
+import numpy as np
+
+from services.leaderboard_service import leaderboard
+
+
+def _position(sorted_values, value):
+    """
+    Место значения среди отсортированных по возрастанию значений
+    
+    Returns:
+        dict: percentile - доля игроков с меньшим значением,
+              top - "топ N%" (место / количество, округление вверх до 0.1),
+              population - размер выборки
+        None если выборка пуста
+    """
+    population = len(sorted_values)
+    if population == 0:
+        return None
+    
+    below = int(np.searchsorted(sorted_values, value, side='left'))
+    above = population - int(np.searchsorted(sorted_values, value, side='right'))
+    return {
+        'percentile': round(below / population * 100, 1),
+        'top': math.ceil((above + 1) / population * 1000) / 10,
+        'population': population
+    }
+
+
+class PercentileIndex:
+    """Отсортированные массивы метрик одного снимка таблицы лидеров"""
+    
+    def __init__(self, snapshot, min_matches=50):
+        columns = snapshot.columns
+        self.min_matches = min_matches
+        self.built_at = snapshot.built_at
+        
+        eligible = np.asarray(columns['matches'], dtype=np.int64) >= min_matches
+        self.kills = np.sort(np.asarray(columns['kills'], dtype=np.int64))
+        self.kd = np.sort(np.asarray(columns['kd'], dtype=np.float64)[eligible])
+        self.win_rate = np.sort(np.asarray(columns['winRate'], dtype=np.float64)[eligible])
+        
+        groups = np.asarray([group or '' for group in columns['scoreGroup']])
+        scores = np.asarray(columns['score'], dtype=np.float64)
+        self.scores = {
+            str(group): np.sort(scores[groups == group])
+            for group in np.unique(groups) if group
+        }
+    
+    def lookup(self, stats):
+        """Перцентили для статистики в формате GET /api/stats/<steam_id>"""
+        rated = stats.get('matches', 0) >= self.min_matches
+        result = {
+            'kills': _position(self.kills, stats.get('kills', 0)),
+            'kd': _position(self.kd, stats.get('kd', 0.0)) if rated else None,
+            'winRate': _position(self.win_rate, stats.get('winRate', 0)) if rated else None,
+            'score': None,
+            'minMatches': self.min_matches,
+            'snapshotAt': self.built_at
+        }
+        
+        rank = stats.get('rank')
+        if rank and rank['groupId'] in self.scores:
+            result['score'] = _position(self.scores[rank['groupId']], rank['score'])
+            if result['score'] is not None:
+                result['score']['groupId'] = rank['groupId']
+        
+        return result
+
+
+class PlayerPercentiles:
+    """Держит индекс последнего снимка таблицы лидеров"""
+    
+    def __init__(self):
+        self.index = None
+        self.min_matches = 50
+    
+    def rebuild(self, snapshot):
+        """Listener таблицы лидеров: пересобрать массивы по новому снимку"""
+        self.index = PercentileIndex(snapshot, self.min_matches)
+    
+    def lookup(self, stats):
+        """
+        Перцентили игрока или None, пока первый снимок не построен
+        (построение запускается в фоне)
+        """
+        index = self.index
+        if index is None:
+            leaderboard.warm_up()
+            return None
+        return index.lookup(stats)
+
+
+player_percentiles = PlayerPercentiles()
+leaderboard.add_listener(player_percentiles.rebuild)
+
+
+def init_percentiles(app):
+    """Настройка перцентилей из конфигурации приложения"""
+    player_percentiles.min_matches = app.config.get('PERCENTILE_MIN_MATCHES', 50)
+    return player_percentiles
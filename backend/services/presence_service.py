@@ -0,0 +1,169 @@
+"""
+Онлайн-статусы участников кланов (Steam Web API)
+
+Фоновый опрос раз в STEAM_PRESENCE_INTERVAL секунд запрашивает статусы всех
+участников кланов пачками по 100 Steam ID (лимит GetPlayerSummaries) и пишет их
+в таблицу steam_presence. Опрос выполняет один воркер (pg advisory lock), читают
+все: состав клана берёт статусы одним запросом к steam_presence и не ждёт Steam API.
+Статус старше STEAM_PRESENCE_MAX_AGE считается неизвестным.
+"""
+import logging
+from datetime import datetime, timedelta
+
+import requests
+
+from models import db, ClanMember, Player, SteamPresence
+from services.background import PeriodicTask, advisory_lock
+
+logger = logging.getLogger(__name__)
+
+# GetPlayerSummaries принимает до 100 Steam ID
+STEAM_BATCH_SIZE = 100
+
+PRESENCE_LOCK_KEY = 0x5a52_4202  # pg advisory lock: один опрос на все воркеры
+
+# Строки игроков, покинувших кланы, перестают обновляться и удаляются
+PRESENCE_RETENTION = timedelta(days=1)
+
+
+def clan_member_steam_ids():
+    """Steam ID всех участников кланов"""
+    rows = db.session.query(Player.steam_id).join(
+        ClanMember, ClanMember.player_id == Player.id
+    ).distinct()
+    return [steam_id for (steam_id,) in rows]
+
+
+def refresh_presence(steam, steam_ids, now=None):
+    """
+    Запросить статусы в Steam и записать их в steam_presence
+    
+    Пачка, на которой Steam API вернул ошибку, пропускается: её строки остаются
+    со старым updated_at и со временем становятся устаревшими.
+    
+    Args:
+        steam: SteamService
+        steam_ids: Steam ID для опроса
+    
+    Returns:
+        dict: {'players', 'updated', 'failed'}
+    """
+    now = now or datetime.utcnow()
+    result = {'players': len(steam_ids), 'updated': 0, 'failed': 0}
+    
+    for start in range(0, len(steam_ids), STEAM_BATCH_SIZE):
+        batch = steam_ids[start:start + STEAM_BATCH_SIZE]
+        try:
+            presences = steam.get_presences(batch)
+        except requests.RequestException as e:
+            logger.warning(f"Steam presence batch of {len(batch)} failed: {e}")
+            result['failed'] += len(batch)
+            continue
+        
+        existing = {
+            steam_id
+            for (steam_id,) in db.session.query(SteamPresence.steam_id).filter(
+                SteamPresence.steam_id.in_(batch)
+            )
+        }
+        
+        inserts = []
+        updates = []
+        for steam_id, (status, persona_state, game_id) in presences.items():
+            row = {
+                'steam_id': steam_id,
+                'status': status,
+                'persona_state': persona_state,
+                'game_id': game_id,
+                'updated_at': now
+            }
+            (updates if steam_id in existing else inserts).append(row)
+        
+        if inserts:
+            db.session.execute(db.insert(SteamPresence), inserts)
+        if updates:
+            db.session.execute(db.update(SteamPresence), updates)
+        db.session.commit()
+        result['updated'] += len(presences)
+    
+    return result
+
+
+def get_presence_statuses(steam_ids, max_age, now=None):
+    """Свежие статусы из steam_presence одним запросом: {steam_id: status}"""
+    if not steam_ids:
+        return {}
+    since = (now or datetime.utcnow()) - timedelta(seconds=max_age)
+    rows = db.session.query(SteamPresence.steam_id, SteamPresence.status).filter(
+        SteamPresence.steam_id.in_(steam_ids),
+        SteamPresence.updated_at >= since
+    )
+    return dict(rows)
+
+
+class SteamPresencePoller:
+    """Периодический опрос Steam Web API в фоновом потоке воркера"""
+    
+    def __init__(self):
+        self.app = None
+        self.last_result = None
+        self.task = PeriodicTask('steam-presence', self.run, 60)
+    
+    def run(self):
+        with self.app.app_context():
+            try:
+                self._run()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+    
+    def _run(self):
+        # Импорт здесь: синглтон SteamService требует STEAM_WEB_API_KEY при создании
+        from services.steam_service import steam_service
+        
+        with advisory_lock(PRESENCE_LOCK_KEY) as locked:
+            if not locked:
+                return
+            
+            # Другой воркер уже опросил Steam в этом интервале
+            last = db.session.query(db.func.max(SteamPresence.updated_at)).scalar()
+            if last is not None and datetime.utcnow() - last < timedelta(seconds=self.task.interval / 2):
+                return
+            
+            steam_ids = clan_member_steam_ids()
+            db.session.rollback()  # не держим транзакцию открытой во время запросов к Steam
+            self.last_result = refresh_presence(steam_service, steam_ids)
+            
+            cutoff = datetime.utcnow() - PRESENCE_RETENTION
+            self.last_result['expired'] = SteamPresence.query.filter(SteamPresence.updated_at < cutoff).delete(
+                synchronize_session=False
+            )
+            db.session.commit()
+        
+        logger.info(f"Steam presence refreshed: {self.last_result}")
+    
+    def status(self):
+        status = self.task.status()
+        status['lastResult'] = self.last_result
+        return status
+
+
+steam_presence = SteamPresencePoller()
+
+
+def init_steam_presence(app):
+    """Настройка опроса статусов; поток стартует с первым запросом воркера"""
+    steam_presence.app = app
+    steam_presence.task.interval = app.config.get('STEAM_PRESENCE_INTERVAL', 60)
+    
+    if not app.config.get('STEAM_WEB_API_KEY'):
+        # Без ключа Steam API опрос невозможен: составы показывают статус по last_login
+        steam_presence.task.interval = 0
+    
+    @app.before_request
+    def ensure_steam_presence():
+        steam_presence.task.ensure_running()
+    
+    return steam_presence
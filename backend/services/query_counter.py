@@ -0,0 +1,110 @@
+"""
+Подсчёт SQL-запросов (контроль N+1)
+
+count_queries() считает запросы, выполненные в блоке текущим потоком:
+
+    with count_queries() as counter:
+        client.get('/api/clans')
+    assert counter.count <= 2
+
+init_query_counter(app) в режиме отладки (или QUERY_COUNT_HEADER=true) добавляет
+к ответам заголовок X-Query-Count с числом запросов за обработку запроса.
+
+@query_budget(n) задаёт бюджет запросов обработчика: превышение пишется в лог
+с endpoint и числом запросов, а в тестах (app.testing) бросает QueryBudgetExceeded.
+Бюджет доступен как view.query_budget.
+"""
+import functools
+import logging
+import threading
+from contextlib import contextmanager
+
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Обработчик превысил бюджет @query_budget (только при app.testing)"""
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+    
+    def __repr__(self):
+        return f'<QueryCounter count={self.count}>'
+
+
+def _active_counters():
+    counters = getattr(_local, 'counters', None)
+    if counters is None:
+        counters = _local.counters = []
+    return counters
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    for counter in _active_counters():
+        counter.count += 1
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Считать SQL-запросы текущего потока внутри блока"""
+    counter = QueryCounter()
+    counters = _active_counters()
+    counters.append(counter)
+    try:
+        yield counter
+    finally:
+        counters.remove(counter)
+
+
+def query_budget(limit):
+    """Бюджет SQL-запросов обработчика (без запросов декораторов выше, например require_auth)"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with count_queries() as counter:
+                result = view(*args, **kwargs)
+            if counter.count > limit:
+                message = f"Query budget exceeded: {request.endpoint} made {counter.count} queries, budget {limit}"
+                if current_app.testing:
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return result
+        
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
+
+
+def init_query_counter(app):
+    """Заголовок X-Query-Count (только в режиме отладки или с QUERY_COUNT_HEADER)"""
+    if not (app.debug or app.config.get('QUERY_COUNT_HEADER', False)):
+        return
+    
+    @app.before_request
+    def start_query_count():
+        g.query_counter = QueryCounter()
+        _active_counters().append(g.query_counter)
+    
+    @app.after_request
+    def add_query_count_header(response):
+        counter = g.get('query_counter')
+        if counter is not None:
+            response.headers['X-Query-Count'] = str(counter.count)
+        return response
+    
+    @app.teardown_request
+    def stop_query_count(exc):
+        counter = g.pop('query_counter', None)
+        if counter is not None and counter in _active_counters():
+            _active_counters().remove(counter)
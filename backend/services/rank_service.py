@@ -0,0 +1,79 @@
+import hashlib
+import threading
+import time
+
+from flask import current_app
+
+from services.mongo_service import get_collection
+
+
+class RankConfigCache:
+    """
+    Кэш конфигурации рангов (configs, type=score) в памяти воркера
+    
+    Таблица иконок меняется редко: документ перечитывается не чаще раза в ttl секунд.
+    Тело ответа сериализуется один раз, ETag - sha256 от тела, поэтому он меняется
+    только при изменении содержимого конфигурации.
+    """
+    
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entry = None  # (body, etag)
+        self._loaded_at = None
+        self.loads = 0
+    
+    def _load(self):
+        config = get_collection('configs').find_one({'type': 'score'}, {'icons': 1})
+        self.loads += 1
+        if not config:
+            return None
+        
+        icons = config.get('icons', {})
+        body = current_app.json.dumps({
+            'success': True,
+            'rankConfig': {
+                'icons': icons,
+                'groups': list(icons.keys())
+            }
+        })
+        return body, hashlib.sha256(body.encode()).hexdigest()
+    
+    def get(self):
+        """
+        Текущая конфигурация
+        
+        Returns:
+            tuple: (body JSON, etag) или None если конфигурации нет
+        """
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return self._entry
+        
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return self._entry
+            
+            try:
+                entry = self._load()
+            except Exception:
+                # MongoDB недоступен - отдаём последнюю известную конфигурацию
+                if self._entry is None:
+                    raise
+                return self._entry
+            
+            self._entry = entry
+            self._loaded_at = time.monotonic()
+            return entry
+    
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+
+rank_config_cache = RankConfigCache()
+
+
+def init_rank_config(app):
+    """Настройка кэша конфигурации рангов"""
+    rank_config_cache.ttl = app.config.get('RANK_CONFIG_TTL', 300)
+    return rank_config_cache
@@ -0,0 +1,278 @@
+"""
+Поиск игроков по имени
+
+Имена игроков снимка таблицы лидеров хранятся в PostgreSQL (player_names) с индексами
+text_pattern_ops (префикс) и pg_trgm (подстрока от 3 символов). Таблицу синхронизирует
+один воркер (pg advisory lock) не чаще раза в SEARCH_SYNC_INTERVAL, записывая только
+новые и переименованные имена; остальные воркеры ничего не строят в памяти. Строки
+результата (статистика) берутся из снимка таблицы лидеров воркера.
+
+Пока снимок или player_names не готовы, используется запасной путь: якорный
+экранированный $regex по mainstats с ограничением времени выполнения.
+"""
+import logging
+import re
+import unicodedata
+from datetime import datetime, timedelta
+
+import pymongo.errors
+from sqlalchemy.exc import OperationalError
+
+from models import db, PlayerName
+from services.background import advisory_lock, last_run_at, record_run
+from services.leaderboard_service import leaderboard
+from services.mongo_service import get_collection
+from services.stats_service import decode_player_stats
+
+logger = logging.getLogger(__name__)
+
+NAMES_LOCK_KEY = 0x5a52_4203  # pg advisory lock: одна синхронизация имён на все воркеры
+NAMES_TASK = 'player-names'
+
+# Уровни совпадения (меньше - выше в выдаче)
+MATCH_EXACT = 0
+MATCH_PREFIX = 1
+MATCH_WORD_PREFIX = 2
+MATCH_SUBSTRING = 3
+
+TOKEN_SPLIT_RE = re.compile(r'[\W_]+')
+
+# Поля mainstats для строки результата поиска (PlayerStats.to_row)
+SEARCH_PROJECTION = {
+    'playerName': 1, 'kills': 1, 'deaths': 1, 'matches': 1, 'wins': 1, 'revives': 1, 'time': 1
+}
+
+
+def normalize_name(name):
+    """Нормализация имени для поиска: NFKC, casefold, схлопнутые пробелы"""
+    return ' '.join(unicodedata.normalize('NFKC', name).casefold().split())
+
+
+def match_level(name, query):
+    """Уровень совпадения нормализованного имени с запросом"""
+    if name == query:
+        return MATCH_EXACT
+    if name.startswith(query):
+        return MATCH_PREFIX
+    # Первое слово уже покрыто префиксом полного имени
+    if any(word.startswith(query) for word in TOKEN_SPLIT_RE.split(name)[1:]):
+        return MATCH_WORD_PREFIX
+    return MATCH_SUBSTRING
+
+
+def word_prefix_pattern(query):
+    """Регулярное выражение начала слова (не первого) для PostgreSQL и Python re"""
+    return r'(\W|_)' + re.escape(query)
+
+
+def sync_player_names(snapshot, batch_size=5000, now=None):
+    """
+    Записать в player_names новые и переименованные имена снимка
+    
+    Returns:
+        dict: {'players', 'new', 'renamed'}
+    """
+    now = now or datetime.utcnow()
+    result = {'players': len(snapshot), 'new': 0, 'renamed': 0}
+    
+    for start in range(0, len(snapshot), batch_size):
+        steam_ids = snapshot.steam_ids[start:start + batch_size]
+        names = snapshot.names[start:start + batch_size]
+        existing = dict(
+            db.session.query(PlayerName.steam_id, PlayerName.player_name).filter(
+                PlayerName.steam_id.in_(steam_ids)
+            )
+        )
+        
+        inserts = []
+        updates = []
+        for steam_id, name in zip(steam_ids, names):
+            name = name if isinstance(name, str) else ''
+            previous = existing.get(steam_id)
+            if previous == name:
+                continue
+            row = {
+                'steam_id': steam_id,
+                'player_name': name,
+                'name_normalized': normalize_name(name),
+                'updated_at': now
+            }
+            (inserts if previous is None else updates).append(row)
+        
+        if inserts:
+            db.session.execute(db.insert(PlayerName), inserts)
+        if updates:
+            db.session.execute(db.update(PlayerName), updates)
+        db.session.commit()
+        result['new'] += len(inserts)
+        result['renamed'] += len(updates)
+    
+    return result
+
+
+class PlayerSearch:
+    """Поиск по player_names; пока таблица не синхронизирована - запасной поиск по MongoDB"""
+    
+    def __init__(self):
+        self.app = None
+        self.limit = 10
+        self.max_candidates = 5000
+        self.budget_ms = 50
+        self.max_query_length = 64
+        self.sync_interval = 900
+        self.sync_batch_size = 5000
+        self.names_ready = False
+        self.last_sync = None
+    
+    def configure(self, limit=None, max_candidates=None, budget_ms=None, max_query_length=None,
+                  sync_interval=None, sync_batch_size=None):
+        if limit is not None:
+            self.limit = limit
+        if max_candidates is not None:
+            self.max_candidates = max_candidates
+        if budget_ms is not None:
+            self.budget_ms = budget_ms
+        if max_query_length is not None:
+            self.max_query_length = max_query_length
+        if sync_interval is not None:
+            self.sync_interval = sync_interval
+        if sync_batch_size is not None:
+            self.sync_batch_size = sync_batch_size
+    
+    def sync(self, snapshot):
+        """Listener таблицы лидеров: синхронизировать player_names (один воркер на интервал)"""
+        if self.app is None:
+            return
+        
+        with self.app.app_context():
+            try:
+                with advisory_lock(NAMES_LOCK_KEY) as locked:
+                    if not locked:
+                        return
+                    
+                    # Другой воркер уже синхронизировал имена в этом интервале
+                    last = last_run_at(NAMES_TASK)
+                    if last is not None and datetime.utcnow() - last < timedelta(seconds=self.sync_interval):
+                        return
+                    
+                    self.last_sync = sync_player_names(snapshot, self.sync_batch_size)
+                    record_run(NAMES_TASK, self.last_sync)
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+        
+        logger.info(f"Player names synced: {self.last_sync}")
+    
+    def search(self, query):
+        """
+        Поиск игроков по имени
+        
+        Returns:
+            dict: {'players': [...], 'complete': bool, 'source': 'index' | 'mongo'}
+        
+        Raises:
+            ValueError: пустой запрос
+        """
+        query = query[:self.max_query_length].strip()
+        normalized = normalize_name(query)
+        if not normalized:
+            raise ValueError('Пустой поисковый запрос')
+        
+        snapshot = leaderboard.snapshot
+        if not self.names_ready:
+            self.names_ready = last_run_at(NAMES_TASK) is not None
+        if snapshot is None or not self.names_ready:
+            leaderboard.warm_up()
+            return self._search_mongo(query)
+        
+        candidates, complete = self._search_names(normalized)
+        
+        indexes = snapshot.indexes_of(list(candidates))
+        kills = snapshot.columns['kills']
+        ranked = sorted(indexes.items(), key=lambda item: (
+            candidates[item[0]][0], -kills[item[1]], candidates[item[0]][1]
+        ))
+        return {
+            'players': snapshot.rows([index for _, index in ranked[:self.limit]]),
+            'complete': complete,
+            'source': 'index'
+        }
+    
+    def _search_names(self, query):
+        """
+        Кандидаты из player_names: {steam_id: (уровень совпадения, имя)}, complete
+        
+        Сначала префикс имени; затем подстрока (от 3 символов, индекс pg_trgm) или начало
+        слова. Запросы ограничены statement_timeout = SEARCH_TIME_BUDGET_MS и
+        SEARCH_MAX_CANDIDATES строками; при срабатывании ограничения complete=False.
+        """
+        column = PlayerName.name_normalized
+        stages = [column.startswith(query, autoescape=True)]
+        if len(query) >= 3:
+            stages.append(column.contains(query, autoescape=True))
+        else:
+            stages.append(column.regexp_match(word_prefix_pattern(query)))
+        
+        candidates = {}
+        complete = True
+        try:
+            if db.engine.dialect.name == 'postgresql':
+                db.session.execute(db.text(f'SET LOCAL statement_timeout = {int(self.budget_ms)}'))
+            for condition in stages:
+                if len(candidates) >= self.limit:
+                    break
+                remaining = self.max_candidates - len(candidates)
+                rows = db.session.query(PlayerName.steam_id, column).filter(condition).limit(remaining + 1).all()
+                if len(rows) > remaining:
+                    rows = rows[:remaining]
+                    complete = False
+                for steam_id, name in rows:
+                    if steam_id not in candidates:
+                        candidates[steam_id] = (match_level(name, query), name)
+                if not complete:
+                    break
+        except OperationalError:
+            # statement_timeout: отдаём найденное до него
+            complete = False
+        finally:
+            db.session.rollback()
+        
+        return candidates, complete
+    
+    def _search_mongo(self, query):
+        """Запасной путь: префикс имени, ввод экранирован, время выполнения ограничено"""
+        collection = get_collection('mainstats')
+        cursor = collection.find(
+            {'playerName': {'$regex': '^' + re.escape(query), '$options': 'i'}},
+            SEARCH_PROJECTION
+        ).limit(self.limit).max_time_ms(self.budget_ms)
+        
+        players = []
+        complete = True
+        try:
+            for user in cursor:
+                players.append(decode_player_stats(user).to_row())
+        except pymongo.errors.ExecutionTimeout:
+            complete = False
+        
+        return {'players': players, 'complete': complete, 'source': 'mongo'}
+
+
+player_search = PlayerSearch()
+leaderboard.add_listener(player_search.sync)
+
+
+def init_search(app):
+    """Настройка поиска игроков из конфигурации приложения"""
+    player_search.app = app
+    player_search.configure(
+        limit=app.config.get('SEARCH_RESULT_LIMIT', 10),
+        max_candidates=app.config.get('SEARCH_MAX_CANDIDATES', 5000),
+        budget_ms=app.config.get('SEARCH_TIME_BUDGET_MS', 50),
+        max_query_length=app.config.get('SEARCH_MAX_QUERY_LENGTH', 64),
+        sync_interval=app.config.get('SEARCH_SYNC_INTERVAL', 900),
+        sync_batch_size=app.config.get('SEARCH_SYNC_BATCH_SIZE', 5000)
+    )
+    return player_search
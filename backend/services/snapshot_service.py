@@ -0,0 +1,171 @@
+"""
+Снимки статистики участников кланов и заявителей
+
+ClanMember.stats_snapshot и ClanApplication.stats_snapshot (pending) периодически
+обновляются из mainstats: чтение пачками через $in, запись - bulk UPDATE по
+первичному ключу, только для строк, где статистика изменилась. Составы кланов
+и заявки рендерятся из PostgreSQL без обращения к MongoDB. Обновление выполняет
+один воркер раз в STATS_SNAPSHOT_INTERVAL (pg advisory lock + task_runs).
+"""
+import logging
+from datetime import datetime, timedelta
+
+import pymongo.errors
+
+from models import db, ClanMember, ClanApplication, Player
+from services.background import PeriodicTask, advisory_lock, last_run_at, record_run
+from services.mongo_service import get_collection
+from services.stats_service import decode_player_stats, stats_projection
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOTS_LOCK_KEY = 0x5a52_4204  # pg advisory lock: одно обновление на все воркеры
+SNAPSHOTS_TASK = 'stats-snapshots'
+
+# Снимок - заголовок профиля (секция summary, без словарей оружия/техники/ролей)
+SNAPSHOT_PROJECTION = stats_projection(frozenset())
+
+
+def build_stats_snapshot(user):
+    """Снимок статистики из документа mainstats"""
+    return decode_player_stats(user).to_dict()
+
+
+def fetch_stats_snapshots(steam_ids):
+    """Снимки для списка Steam ID одним запросом $in: {steam_id: snapshot}"""
+    if not steam_ids:
+        return {}
+    collection = get_collection('mainstats')
+    return {
+        user['_id']: build_stats_snapshot(user)
+        for user in collection.find({'_id': {'$in': list(steam_ids)}}, SNAPSHOT_PROJECTION)
+    }
+
+
+def get_stats_snapshot(steam_id):
+    """Снимок одного игрока (при подаче заявки); при недоступности MongoDB - пустой"""
+    try:
+        return fetch_stats_snapshots([steam_id]).get(steam_id, {})
+    except (RuntimeError, pymongo.errors.PyMongoError) as e:
+        logger.warning(f"Stats snapshot for {steam_id} skipped: {e}")
+        return {}
+
+
+def _snapshot_targets():
+    """
+    (модель, id строки, steam_id, текущий снимок) для участников и pending заявок
+    
+    Строки упорядочены по id: bulk UPDATE пачки блокирует их всегда в одном порядке.
+    """
+    members = db.session.query(
+        ClanMember.id, Player.steam_id, ClanMember.stats_snapshot
+    ).join(Player, ClanMember.player_id == Player.id).order_by(ClanMember.id)
+    
+    applications = db.session.query(
+        ClanApplication.id, Player.steam_id, ClanApplication.stats_snapshot
+    ).join(Player, ClanApplication.player_id == Player.id).filter(
+        ClanApplication.status == 'pending'
+    ).order_by(ClanApplication.id)
+    
+    targets = [(ClanMember, row_id, steam_id, snapshot) for row_id, steam_id, snapshot in members]
+    targets += [(ClanApplication, row_id, steam_id, snapshot) for row_id, steam_id, snapshot in applications]
+    return targets
+
+
+def refresh_stats_snapshots(batch_size=500):
+    """
+    Обновить снимки всех участников кланов и pending заявок
+    
+    Returns:
+        dict: {'rows': всего строк, 'updated': изменённых, 'missing': нет в mainstats}
+    """
+    targets = _snapshot_targets()
+    db.session.rollback()  # не держим транзакцию открытой во время чтения из MongoDB
+    
+    by_steam_id = {}
+    for target in targets:
+        by_steam_id.setdefault(target[2], []).append(target)
+    
+    steam_ids = list(by_steam_id)
+    updated = 0
+    missing = 0
+    
+    for start in range(0, len(steam_ids), batch_size):
+        batch = steam_ids[start:start + batch_size]
+        snapshots = fetch_stats_snapshots(batch)
+        
+        changes = {ClanMember: [], ClanApplication: []}
+        for steam_id in batch:
+            snapshot = snapshots.get(steam_id)
+            if snapshot is None:
+                missing += 1
+                continue
+            for model, row_id, _, current in by_steam_id[steam_id]:
+                if current != snapshot:
+                    changes[model].append({'id': row_id, 'stats_snapshot': snapshot})
+        
+        for model, rows in changes.items():
+            if rows:
+                rows.sort(key=lambda row: row['id'])
+                # ORM bulk UPDATE по первичному ключу (executemany)
+                db.session.execute(db.update(model), rows)
+                updated += len(rows)
+        db.session.commit()
+    
+    return {'rows': len(targets), 'updated': updated, 'missing': missing}
+
+
+class StatsSnapshotter:
+    """Периодическое обновление снимков в фоновом потоке воркера"""
+    
+    def __init__(self):
+        self.app = None
+        self.batch_size = 500
+        self.last_result = None
+        self.task = PeriodicTask('stats-snapshots', self.run, 900)
+    
+    def run(self):
+        with self.app.app_context():
+            try:
+                self._run()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+    
+    def _run(self):
+        with advisory_lock(SNAPSHOTS_LOCK_KEY) as locked:
+            if not locked:
+                return
+            
+            # Другой воркер уже обновил снимки в этом интервале
+            last = last_run_at(SNAPSHOTS_TASK)
+            if last is not None and datetime.utcnow() - last < timedelta(seconds=self.task.interval / 2):
+                return
+            
+            self.last_result = refresh_stats_snapshots(self.batch_size)
+            record_run(SNAPSHOTS_TASK, self.last_result)
+        
+        logger.info(f"Stats snapshots refreshed: {self.last_result}")
+    
+    def status(self):
+        status = self.task.status()
+        status['lastResult'] = self.last_result
+        return status
+
+
+stats_snapshotter = StatsSnapshotter()
+
+
+def init_stats_snapshots(app):
+    """Настройка фонового обновления снимков; поток стартует с первым запросом воркера"""
+    stats_snapshotter.app = app
+    stats_snapshotter.batch_size = app.config.get('STATS_SNAPSHOT_BATCH_SIZE', 500)
+    stats_snapshotter.task.interval = app.config.get('STATS_SNAPSHOT_INTERVAL', 900)
+    
+    @app.before_request
+    def ensure_stats_snapshotter():
+        stats_snapshotter.task.ensure_running()
+    
+    return stats_snapshotter
@@ -2,6 +2,12 @@
 Сервис для работы со статистикой игроков Squad
 Портировано из Discord бота (JavaScript -> Python)
 """
+import heapq
+import re
+from functools import lru_cache
+from operator import itemgetter
+
+import numpy as np
 
 # Списки техники для категоризации
 HEAVY_VEHICLES = [
@@ -34,6 +40,12 @@ HEAVY_VEHICLE_WEAPONS = [
     "_BM21_", "_120mm_"
 ]
 
+# Ножи и штыки по последней части ключа оружия (как было в statsCalculations.js)
+KNIFE_WEAPONS = frozenset([
+    "SOCP", "AK74Bayonet", "M9Bayonet", "G3Bayonet",
+    "Bayonet2000", "AKMBayonet", "SA80Bayonet", "QNL-95", "OKC-3S"
+])
+
 
 def calc_vehicle_time(possess):
     """
@@ -63,6 +75,99 @@ def calc_vehicle_time(possess):
     return heavy_time, heli_time
 
 
+def _build_trie_pattern(words):
+    """
+    Собрать regex-альтернативу из префиксного дерева слов
+    
+    Движок re перебирает ветви альтернативы по очереди, поэтому плоский
+    список из ~70 литералов медленный; дерево отсекает ветви по первым символам.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        
+        optional = '' in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        
+        return '(?:' + '|'.join(branches) + ')' + ('?' if optional else '')
+    
+    return build(trie)
+
+
+# Один скомпилированный автомат вместо ~70 отдельных проверок подстроки.
+# Lookahead находит совпадения на каждой позиции, в т.ч. перекрывающиеся
+# ("_BMP2_30mm_" содержит и "_BMP2_", и "_30mm_"). Ни один шаблон не является
+# префиксом другого, поэтому на одной позиции совпадает не больше одного шаблона.
+HEAVY_VEHICLE_WEAPONS_RE = re.compile('(?=({}))'.format(_build_trie_pattern(HEAVY_VEHICLE_WEAPONS)))
+
+
+def weapon_type(vehicle_weight, is_artillery, is_knife):
+    """Тип оружия для детальной статистики: vehicle, knife, artillery или infantry"""
+    if vehicle_weight:
+        return 'vehicle'
+    if is_knife:
+        return 'knife'
+    if is_artillery:
+        return 'artillery'
+    return 'infantry'
+
+
+@lru_cache(maxsize=8192)
+def classify_weapon(weapon_key):
+    """
+    Классификация ключа оружия (результат кэшируется по ключу)
+    
+    Ключи оружия берутся из конечного набора игровых blueprint-ов, поэтому
+    после прогрева классификация любого ключа - это один lookup в кэше.
+    
+    Args:
+        weapon_key: str - ключ оружия из mainstats.weapons
+    
+    Returns:
+        tuple: (weapon_name, vehicle_weight, is_artillery, is_knife, detail_key)
+            weapon_name - имя для категоризации или None (ключ без '_')
+            vehicle_weight - сколько шаблонов техники содержит ключ
+                (как в боте: ключ засчитывается один раз на каждый шаблон)
+            is_artillery, is_knife - флаги категоризации бота (categorize_weapons)
+            detail_key - (имя, тип) для детальной статистики, см. weapon_type
+    """
+    vehicle_weight = len({match.group(1) for match in HEAVY_VEHICLE_WEAPONS_RE.finditer(weapon_key)})
+    
+    parts = weapon_key.split('_')
+    lower_key = weapon_key.lower()
+    is_knife = 'knife' in lower_key or 'shovel' in lower_key
+    
+    # Детальная статистика - как в прежнем клиенте: имя - последняя часть ключа,
+    # штыки из KNIFE_WEAPONS тоже ножи, 'Heavy' в любой части ключа - артиллерия
+    detail_key = (parts[-1] or weapon_key, weapon_type(
+        vehicle_weight,
+        'Projectile' in weapon_key or 'Heavy' in weapon_key,
+        is_knife or parts[-1] in KNIFE_WEAPONS
+    ))
+    
+    if len(parts) < 2:
+        return None, vehicle_weight, False, False, detail_key
+    
+    second_part = parts[1]
+    is_artillery = 'Projectile' in second_part
+    if is_artillery:
+        suffix = parts[2] if len(parts) > 2 else ""
+        weapon_name = f"{second_part}_{suffix}"
+    else:
+        weapon_name = second_part
+    
+    return weapon_name, vehicle_weight, is_artillery, is_knife, detail_key
+
+
 def calc_vehicle_kills(weapons):
     """
     Расчёт убийств из тяжёлой техники
@@ -75,13 +180,10 @@ def calc_vehicle_kills(weapons):
     """
     total_kills = 0
     
-    for vehicle_weapon in HEAVY_VEHICLE_WEAPONS:
-        # Находим все оружия, содержащие название техники
-        matching_weapons = [key for key in weapons.keys() if vehicle_weapon in key]
-        
-        # Суммируем убийства для найденных оружий
-        for weapon_key in matching_weapons:
-            total_kills += weapons[weapon_key]
+    for weapon_key, kills in weapons.items():
+        vehicle_weight = classify_weapon(weapon_key)[1]
+        if vehicle_weight:
+            total_kills += kills * vehicle_weight
     
     return total_kills
 
@@ -141,55 +243,60 @@ def get_user_high_score_and_group(user):
     return high_group_id, score_groups.get(high_group_id, 0)
 
 
-def categorize_weapons(weapons):
+def _aggregate_weapons(weapons):
     """
-    Категоризация оружия по типам (как в Discord боте)
-    
-    Args:
-        weapons: dict - словарь убийств по оружию
+    Один проход по weapons: убийства из техники + категоризация + детальная статистика
     
     Returns:
-        dict: категоризированное оружие
+        tuple: (vehicle_kills, categorized, detailed)
+            vehicle_kills, categorized - как calc_vehicle_kills и categorize_weapons
+            detailed - [(ключ оружия, (имя, тип), kills)] - запись на каждый ключ, см. classify_weapon
     """
-    result = {}
+    vehicle_kills = 0
+    categorized = {}
+    detailed = []
     artillery_sum = 0
     knife_sum = 0
     
     for weapon_key, kills in weapons.items():
-        parts = weapon_key.split('_')
+        weapon_name, vehicle_weight, is_artillery, is_knife, detail_key = classify_weapon(weapon_key)
         
-        if len(parts) < 2:
-            continue
+        if vehicle_weight:
+            vehicle_kills += kills * vehicle_weight
+        
+        detailed.append((weapon_key, detail_key, kills))
         
-        second_part = parts[1] if len(parts) > 1 else ""
+        if weapon_name is None:
+            continue
         
-        # Проверка на артиллерию
-        if 'Projectile' in second_part:
-            prefix = parts[1] if len(parts) > 1 else ""
-            suffix = parts[2] if len(parts) > 2 else ""
-            weapon_name = f"{prefix}_{suffix}"
+        if is_artillery:
             artillery_sum += kills
-        else:
-            weapon_name = second_part
         
-        # Проверка на нож
-        if 'knife' in weapon_key.lower() or 'shovel' in weapon_key.lower():
+        if is_knife:
             knife_sum += kills
             continue
         
-        # Суммируем убийства по типу оружия
-        if weapon_name in result:
-            result[weapon_name] += kills
-        else:
-            result[weapon_name] = kills
+        categorized[weapon_name] = categorized.get(weapon_name, 0) + kills
     
-    # Добавляем суммарные данные
     if artillery_sum > 0:
-        result['Artillery'] = artillery_sum
+        categorized['Artillery'] = artillery_sum
     if knife_sum > 0:
-        result['Knife'] = knife_sum
+        categorized['Knife'] = knife_sum
     
-    return result
+    return vehicle_kills, categorized, detailed
+
+
+def categorize_weapons(weapons):
+    """
+    Категоризация оружия по типам (как в Discord боте)
+    
+    Args:
+        weapons: dict - словарь убийств по оружию
+    
+    Returns:
+        dict: категоризированное оружие
+    """
+    return _aggregate_weapons(weapons)[1]
 
 
 def calculate_kd_ratio(kills, deaths):
@@ -207,3 +314,571 @@ def calculate_kd_ratio(kills, deaths):
         return float(kills) if kills > 0 else 0.0
     
     return round(kills / deaths, 2)
+
+
+def _first_number(value):
+    """Первое числовое значение объекта (None если его нет)"""
+    for v in value.values():
+        decoder = _NUMBER_DECODERS.get(type(v)) or _decoder_for(type(v))
+        if decoder is int:
+            return int(v)
+    return None
+
+
+# Тип значения -> декодер. Типы-наследники (bson Int64, SON и т.п.) добавляются
+# при первой встрече, дальше поиск - один lookup по точному типу
+_NUMBER_DECODERS = {int: int, float: int, bool: int, dict: _first_number}
+
+
+def _decoder_for(cls):
+    if issubclass(cls, (int, float)):
+        decoder = int
+    elif issubclass(cls, dict):
+        decoder = _first_number
+    else:
+        decoder = False
+    _NUMBER_DECODERS[cls] = decoder
+    return decoder
+
+
+def safe_int(value, default=0):
+    """
+    Безопасное извлечение integer из значения
+    
+    Числовые поля mainstats могут быть числом, объектом или отсутствовать.
+    Для объекта берётся первое числовое значение.
+    """
+    decoder = _NUMBER_DECODERS.get(type(value))
+    if decoder is None:
+        decoder = _decoder_for(type(value))
+    if decoder:
+        result = decoder(value)
+        if result is not None:
+            return result
+    return default
+
+
+# Поля mainstats, которые нужны decode_player_stats (projection для MongoDB)
+PLAYER_STATS_PROJECTION = {
+    'playerName': 1, 'kills': 1, 'deaths': 1, 'revives': 1, 'teamkills': 1,
+    'matches': 1, 'wins': 1, 'time': 1, 'commanderTime': 1, 'commanderMatches': 1,
+    'squadLeadTime': 1, 'possess': 1, 'weapons': 1, 'roles': 1, 'scoreGroups': 1
+}
+
+# Уровни детализации для параметра fields. summary (заголовок профиля) отдаётся
+# всегда, остальные секции добавляют тяжёлые словари документа
+STATS_SUMMARY_PROJECTION = {
+    'playerName': 1, 'kills': 1, 'deaths': 1, 'revives': 1, 'teamkills': 1,
+    'matches': 1, 'wins': 1, 'time': 1, 'commanderTime': 1, 'commanderMatches': 1,
+    'squadLeadTime': 1, 'scoreGroups': 1
+}
+
+STATS_SECTIONS = {
+    # секция: (поле mainstats, ключи ответа)
+    'weapons': ('weapons', (
+        'vehicleKills', 'topWeapons', 'knifeKills', 'artilleryKills', 'infantryKills',
+        'detailedWeapons', 'topWeapon'
+    )),
+    'vehicles': ('possess', ('heavyVehicleTime', 'heliTime', 'heavyVehicleTimeMs', 'heliTimeMs')),
+    'roles': ('roles', ('topRoles', 'detailedRoles', 'topRole'))
+}
+
+ALL_STATS_SECTIONS = frozenset(STATS_SECTIONS)
+
+
+def parse_stats_fields(value):
+    """
+    Разобрать параметр fields (summary|weapons|vehicles|roles|full, через запятую)
+    
+    Returns:
+        frozenset: запрошенные секции сверх summary
+    
+    Raises:
+        ValueError: неизвестное значение
+    """
+    if not value:
+        return ALL_STATS_SECTIONS
+    
+    sections = set()
+    for name in value.split(','):
+        name = name.strip()
+        if name == 'full':
+            return ALL_STATS_SECTIONS
+        if name in STATS_SECTIONS:
+            sections.add(name)
+        elif name != 'summary':
+            raise ValueError(f'Неизвестное значение fields: {name}')
+    
+    return frozenset(sections)
+
+
+def stats_projection(sections):
+    """MongoDB projection для набора секций"""
+    if sections == ALL_STATS_SECTIONS:
+        return PLAYER_STATS_PROJECTION
+    
+    projection = dict(STATS_SUMMARY_PROJECTION)
+    for name in sections:
+        projection[STATS_SECTIONS[name][0]] = 1
+    return projection
+
+
+def select_stats_sections(stats, sections):
+    """Оставить в полной статистике только запрошенные секции"""
+    if sections == ALL_STATS_SECTIONS:
+        return stats
+    
+    excluded = set()
+    for name in ALL_STATS_SECTIONS - sections:
+        excluded.update(STATS_SECTIONS[name][1])
+    return {key: value for key, value in stats.items() if key not in excluded}
+
+
+TOP_WEAPONS_LIMIT = 10
+TOP_ROLES_LIMIT = 5
+
+# Детальная статистика (вкладки "Оружие" и "Роли" профиля) - без нулевых записей
+DETAILED_WEAPONS_LIMIT = 25
+DETAILED_ROLES_LIMIT = 10
+
+
+def role_display_name(role_key):
+    """Имя роли из ключа вида USA_Rifleman_01: последняя нечисловая часть"""
+    parts = [part for part in role_key.split('_') if part and not part.isdigit()]
+    return parts[-1] if parts else role_key
+
+# Компактная строка игрока (таблица лидеров, поиск) - см. PlayerStats.to_row
+PLAYER_ROW_FIELDS = (
+    'steamId', 'playerName', 'kills', 'deaths', 'kd',
+    'matches', 'wins', 'winRate', 'revives', 'playtimeMinutes'
+)
+
+
+def win_rate(wins, matches):
+    """Процент побед (округлённый до 0.1)"""
+    return round((wins / matches) * 100, 1) if matches > 0 else 0
+
+
+class PlayerStats:
+    """Статистика игрока, декодированная из документа mainstats"""
+    
+    __slots__ = (
+        'steam_id', 'player_name', 'kills', 'deaths', 'revives', 'teamkills',
+        'matches', 'wins', 'time', 'commander_time', 'commander_matches',
+        'squad_lead_time', 'heavy_time', 'heli_time', 'vehicle_kills',
+        'top_weapons', 'top_roles', 'rank', 'weapon_kills', 'detailed_weapons',
+        'detailed_roles'
+    )
+    
+    def __init__(self, steam_id, player_name):
+        self.steam_id = steam_id
+        self.player_name = player_name
+        self.kills = 0
+        self.deaths = 0
+        self.revives = 0
+        self.teamkills = 0
+        self.matches = 0
+        self.wins = 0
+        self.time = None
+        self.commander_time = 0
+        self.commander_matches = 0
+        self.squad_lead_time = 0
+        self.heavy_time = None
+        self.heli_time = None
+        self.vehicle_kills = None
+        self.top_weapons = None
+        self.top_roles = None
+        self.rank = None
+        self.weapon_kills = None  # {тип оружия: kills}
+        self.detailed_weapons = None  # [(ключ оружия, имя, тип, kills)] по убыванию kills
+        self.detailed_roles = None  # [(ключ роли, минуты)] по убыванию времени
+    
+    def to_dict(self):
+        """Сериализация в формат ответа GET /api/stats/<steam_id>"""
+        stats = {
+            'steamId': self.steam_id,
+            'playerName': self.player_name,
+            'kills': self.kills,
+            'deaths': self.deaths,
+            'kd': calculate_kd_ratio(self.kills, self.deaths),
+            'revives': self.revives,
+            'teamkills': self.teamkills,
+            'matches': self.matches,
+            'wins': self.wins,
+            'winRate': win_rate(self.wins, self.matches),
+            'avgKills': round(self.kills / self.matches, 1) if self.matches > 0 else 0,
+        }
+        
+        if self.time is not None:
+            stats['playtime'] = format_time(self.time, 'min')
+            stats['playtimeMinutes'] = self.time
+        
+        if self.commander_time > 0:
+            stats['commanderTime'] = format_time(self.commander_time, 'min')
+            stats['commanderMatches'] = self.commander_matches
+        
+        if self.squad_lead_time > 0:
+            stats['squadLeadTime'] = format_time(self.squad_lead_time, 'min')
+        
+        if self.heavy_time is not None:
+            stats['heavyVehicleTime'] = format_time(self.heavy_time / 60000, 'min')  # мс -> минуты
+            stats['heliTime'] = format_time(self.heli_time / 60000, 'min')
+            stats['heavyVehicleTimeMs'] = self.heavy_time
+            stats['heliTimeMs'] = self.heli_time
+        
+        if self.vehicle_kills is not None:
+            stats['vehicleKills'] = self.vehicle_kills
+            stats['topWeapons'] = [
+                {'name': weapon, 'kills': kills}
+                for weapon, kills in self.top_weapons
+            ]
+            stats['knifeKills'] = self.weapon_kills.get('knife', 0)
+            stats['artilleryKills'] = self.weapon_kills.get('artillery', 0)
+            stats['infantryKills'] = self.weapon_kills.get('infantry', 0)
+            stats['detailedWeapons'] = [
+                {'name': weapon, 'type': kind, 'kills': kills, 'fullName': weapon_key}
+                for weapon_key, weapon, kind, kills in self.detailed_weapons
+            ]
+            stats['topWeapon'] = next(
+                (weapon for weapon in stats['detailedWeapons'] if weapon['type'] == 'infantry'), None
+            )
+        
+        if self.top_roles is not None:
+            stats['topRoles'] = [
+                {'name': role, 'time': format_time(time, 'min'), 'minutes': time}
+                for role, time in self.top_roles
+            ]
+            stats['detailedRoles'] = [
+                {
+                    'name': role_display_name(role),
+                    'time': format_time(time, 'min'),
+                    'timeMinutes': time,
+                    'icon': role.replace('_', '')
+                }
+                for role, time in self.detailed_roles
+            ]
+            stats['topRole'] = stats['detailedRoles'][0] if stats['detailedRoles'] else None
+        
+        if self.rank is not None:
+            group_id, score = self.rank
+            stats['rank'] = {
+                'groupId': group_id,
+                'score': score
+            }
+        
+        return stats
+    
+    def to_row(self):
+        """Компактная строка (PLAYER_ROW_FIELDS) - формат таблицы лидеров и поиска"""
+        return {
+            'steamId': self.steam_id,
+            'playerName': self.player_name,
+            'kills': self.kills,
+            'deaths': self.deaths,
+            'kd': calculate_kd_ratio(self.kills, self.deaths),
+            'matches': self.matches,
+            'wins': self.wins,
+            'winRate': win_rate(self.wins, self.matches),
+            'revives': self.revives,
+            'playtimeMinutes': safe_int(self.time)
+        }
+
+
+def decode_player_stats(user, steam_id=None):
+    """
+    Декодировать документ mainstats в PlayerStats
+    
+    Считает всю производную статистику за один проход по каждому словарю:
+    weapons обходится один раз (техника + категории), possess и roles - по разу,
+    топы собираются через heapq.nlargest вместо полной сортировки.
+    Словари, не попавшие в projection (см. stats_projection), не обрабатываются.
+    
+    Args:
+        user: dict - документ игрока из MongoDB (mainstats)
+        steam_id: str - Steam ID (по умолчанию user['_id'])
+    
+    Returns:
+        PlayerStats
+    """
+    result = PlayerStats(
+        steam_id if steam_id is not None else user.get('_id'),
+        user.get('playerName', 'Unknown')
+    )
+    
+    result.kills = safe_int(user.get('kills', 0))
+    result.deaths = safe_int(user.get('deaths', 0))
+    result.revives = safe_int(user.get('revives', 0))
+    result.teamkills = safe_int(user.get('teamkills', 0))
+    result.matches = safe_int(user.get('matches', 0))
+    result.wins = safe_int(user.get('wins', 0))
+    
+    if 'time' in user:
+        result.time = user['time']
+    
+    result.commander_time = safe_int(user.get('commanderTime', 0))
+    result.commander_matches = safe_int(user.get('commanderMatches', 0))
+    result.squad_lead_time = safe_int(user.get('squadLeadTime', 0))
+    
+    if 'possess' in user:
+        result.heavy_time, result.heli_time = calc_vehicle_time(user['possess'])
+    
+    if 'weapons' in user:
+        result.vehicle_kills, categorized, detailed = _aggregate_weapons(user['weapons'])
+        result.top_weapons = heapq.nlargest(TOP_WEAPONS_LIMIT, categorized.items(), key=itemgetter(1))
+        
+        weapon_kills = {}
+        for _, (_, kind), kills in detailed:
+            weapon_kills[kind] = weapon_kills.get(kind, 0) + kills
+        result.weapon_kills = weapon_kills
+        result.detailed_weapons = [
+            (weapon_key, weapon, kind, kills)
+            for weapon_key, (weapon, kind), kills in heapq.nlargest(DETAILED_WEAPONS_LIMIT, detailed, key=itemgetter(2))
+            if kills > 0
+        ]
+    
+    if 'roles' in user:
+        # Топ ролей - префикс детального списка (nlargest стабилен, как sorted)
+        roles = heapq.nlargest(
+            max(TOP_ROLES_LIMIT, DETAILED_ROLES_LIMIT), user['roles'].items(), key=itemgetter(1)
+        )
+        result.top_roles = roles[:TOP_ROLES_LIMIT]
+        result.detailed_roles = [(role, time) for role, time in roles[:DETAILED_ROLES_LIMIT] if time > 0]
+    
+    if 'scoreGroups' in user:
+        result.rank = get_user_high_score_and_group(user)
+    
+    return result
+
+
+def _mongo_safe_int(value):
+    """
+    Аналог safe_int для aggregation pipeline MongoDB
+    
+    Число -> целое ($toLong отбрасывает дробную часть), объект -> первое
+    числовое значение, всё остальное -> 0.
+    """
+    first_number = {'$arrayElemAt': [{'$filter': {
+        'input': {'$map': {'input': {'$objectToArray': value}, 'as': 'kv', 'in': '$$kv.v'}},
+        'as': 'v',
+        'cond': {'$isNumber': '$$v'}
+    }}, 0]}
+    
+    return {'$switch': {
+        'branches': [
+            {'case': {'$isNumber': value}, 'then': {'$toLong': value}},
+            {'case': {'$eq': [{'$type': value}, 'object']}, 'then': {'$toLong': {'$ifNull': [first_number, 0]}}}
+        ],
+        'default': 0
+    }}
+
+
+def _mongo_vehicle_time(vehicles):
+    """Аналог calc_vehicle_time для pipeline: сумма possess по технике из списка"""
+    return {'$reduce': {
+        'input': {'$objectToArray': {'$ifNull': ['$possess', {}]}},
+        'initialValue': 0,
+        'in': {'$add': ['$$value', {'$cond': [
+            {'$in': [{'$arrayElemAt': [{'$split': ['$$this.k', '_']}, 1]}, vehicles]},
+            '$$this.v',
+            0
+        ]}]}
+    }}
+
+
+CLAN_STATS_FIELDS = ('kills', 'deaths', 'wins', 'matches', 'revives', 'time')
+
+
+def clan_stats_pipeline(steam_ids):
+    """
+    Aggregation pipeline для суммарной статистики клана
+    
+    Один проход по mainstats: $match по Steam ID участников, компактная
+    проекция каждого участника и $group с суммами в одном $facet.
+    """
+    projection = {'playerName': 1}
+    for field in CLAN_STATS_FIELDS:
+        projection[field] = _mongo_safe_int('$' + field)
+    projection['heavyVehicleTimeMs'] = _mongo_vehicle_time(HEAVY_VEHICLES)
+    projection['heliTimeMs'] = _mongo_vehicle_time(HELI_VEHICLES)
+    
+    totals = {'_id': None, 'players': {'$sum': 1}}
+    for field in CLAN_STATS_FIELDS + ('heavyVehicleTimeMs', 'heliTimeMs'):
+        totals[field] = {'$sum': '$' + field}
+    
+    return [
+        {'$match': {'_id': {'$in': list(steam_ids)}}},
+        {'$project': projection},
+        {'$facet': {
+            'members': [],
+            'totals': [{'$group': totals}]
+        }}
+    ]
+
+
+def _derived_clan_stats(row):
+    """Производные показатели (K/D, винрейт, форматированное время) для строки статистики"""
+    kills = row.get('kills', 0)
+    deaths = row.get('deaths', 0)
+    wins = row.get('wins', 0)
+    matches = row.get('matches', 0)
+    playtime = row.get('time', 0)
+    heavy_time = row.get('heavyVehicleTimeMs', 0)
+    heli_time = row.get('heliTimeMs', 0)
+    
+    return {
+        'kills': kills,
+        'deaths': deaths,
+        'kd': calculate_kd_ratio(kills, deaths),
+        'wins': wins,
+        'matches': matches,
+        'winRate': round((wins / matches) * 100, 1) if matches > 0 else 0,
+        'revives': row.get('revives', 0),
+        'playtime': format_time(playtime, 'min'),
+        'playtimeMinutes': playtime,
+        'heavyVehicleTime': format_time(heavy_time / 60000, 'min'),  # мс -> минуты
+        'heliTime': format_time(heli_time / 60000, 'min'),
+        'heavyVehicleTimeMs': heavy_time,
+        'heliTimeMs': heli_time
+    }
+
+
+def summarize_clan_stats(aggregation_result):
+    """
+    Собрать ответ по результату clan_stats_pipeline
+    
+    Args:
+        aggregation_result: dict - единственный документ результата ($facet)
+    
+    Returns:
+        tuple: (totals, averages, members_by_steam_id)
+    """
+    members = {row['_id']: row for row in aggregation_result.get('members', [])}
+    totals_rows = aggregation_result.get('totals', [])
+    totals_row = totals_rows[0] if totals_rows else {}
+    
+    players = totals_row.get('players', 0)
+    totals = _derived_clan_stats(totals_row)
+    
+    average_row = {
+        field: (round(totals_row.get(field, 0) / players) if players else 0)
+        for field in CLAN_STATS_FIELDS + ('heavyVehicleTimeMs', 'heliTimeMs')
+    }
+    averages = _derived_clan_stats(average_row)
+    # Отношения средних равны отношениям сумм; считаем по суммам, а не по округлённым средним
+    averages['kd'] = totals['kd']
+    averages['winRate'] = totals['winRate']
+    
+    members_stats = {
+        steam_id: dict(_derived_clan_stats(row), playerName=row.get('playerName', 'Unknown'))
+        for steam_id, row in members.items()
+    }
+    
+    return totals, averages, members_stats
+
+
+# Числовые колонки для ранжирования (таблица лидеров, перцентили, история)
+STAT_COLUMNS = ('kills', 'deaths', 'matches', 'wins', 'revives', 'time')
+
+
+def _mongo_high_score_group(score_groups):
+    """Аналог get_user_high_score_and_group для pipeline: {k: группа, v: очки} или null"""
+    pairs = {'$objectToArray': score_groups}
+    first_group_score = {'$arrayElemAt': [{'$map': {
+        'input': {'$filter': {'input': pairs, 'as': 'kv', 'cond': {'$eq': ['$$kv.k', '1']}}},
+        'as': 'kv',
+        'in': '$$kv.v'
+    }}, 0]}
+    
+    return {'$cond': [
+        {'$eq': [{'$type': score_groups}, 'object']},
+        {'$reduce': {
+            'input': pairs,
+            'initialValue': {'k': '1', 'v': {'$ifNull': [first_group_score, 0]}},
+            'in': {'$cond': [{'$gte': ['$$this.v', '$$value.v']}, '$$this', '$$value']}
+        }},
+        None
+    ]}
+
+
+def stat_columns_pipeline():
+    """
+    Pipeline для load_stat_columns: числа приводятся на стороне MongoDB
+    (как safe_int), документ сжимается до {_id, playerName, v: [...], g}
+    """
+    return [{'$project': {
+        'playerName': 1,
+        'v': [_mongo_safe_int('$' + field) for field in STAT_COLUMNS],
+        'g': _mongo_high_score_group('$scoreGroups')
+    }}]
+
+
+def _round_like_python(values, digits):
+    """
+    np.round, совпадающий с round() скалярного пути
+    
+    np.round умножает на 10**digits и округляет половины к чётному, round() округляет
+    точное значение float - результаты расходятся только у значений на середине
+    (2212 / 800 = 2.765), их досчитываем через round().
+    """
+    scaled = values * 10 ** digits
+    rounded = np.round(scaled) / 10 ** digits
+    for index in np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6):
+        rounded[index] = round(float(values[index]), digits)
+    return rounded
+
+
+class StatColumns:
+    """Колонки статистики всех игроков в NumPy-массивах (индекс = игрок)"""
+    
+    def __init__(self, steam_ids, names, values, score_groups, scores):
+        self.steam_ids = steam_ids
+        self.names = names
+        self.score_groups = score_groups
+        self.scores = scores
+        
+        for position, field in enumerate(STAT_COLUMNS):
+            setattr(self, field, values[:, position])
+        
+        # Те же формулы, что calculate_kd_ratio и winRate в PlayerStats.to_dict
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.kd = np.where(
+                self.deaths > 0,
+                _round_like_python(self.kills / np.maximum(self.deaths, 1), 2),
+                np.where(self.kills > 0, self.kills, 0).astype(np.float64)
+            )
+            self.win_rate = np.where(
+                self.matches > 0,
+                _round_like_python(self.wins / np.maximum(self.matches, 1) * 100, 1),
+                0.0
+            )
+    
+    def __len__(self):
+        return len(self.steam_ids)
+
+
+def load_stat_columns(collection, batch_size=5000):
+    """
+    Загрузить числовые колонки всех игроков одним потоковым курсором
+    
+    Приведение dict-полей и выбор группы рангов выполняет MongoDB, в Python
+    остаётся только перенос значений в массивы; K/D и винрейт считаются векторно.
+    
+    Returns:
+        StatColumns
+    """
+    steam_ids = []
+    names = []
+    values = []
+    score_groups = []
+    scores = []
+    
+    for doc in collection.aggregate(stat_columns_pipeline(), batchSize=batch_size, allowDiskUse=True):
+        steam_ids.append(doc['_id'])
+        names.append(doc.get('playerName', 'Unknown'))
+        values.extend(doc['v'])
+        group = doc.get('g')
+        score_groups.append(group['k'] if group else None)
+        scores.append(group['v'] if group else 0)
+    
+    values = np.array(values, dtype=np.int64).reshape(-1, len(STAT_COLUMNS))
+    return StatColumns(steam_ids, names, values, score_groups, np.array(scores, dtype=np.float64))
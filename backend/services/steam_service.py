@@ -23,6 +23,19 @@ class SteamService:
         Returns:
             Словарь {steam_id: player_data}
         """
+        try:
+            return self.fetch_player_summaries(steam_ids)
+        except requests.RequestException as e:
+            print(f"[STEAM API ERROR] Не удалось получить данные: {e}")
+            return {}
+    
+    def fetch_player_summaries(self, steam_ids: List[str]) -> Dict[str, dict]:
+        """
+        То же, что get_player_summaries, но ошибка Steam API пробрасывается
+        
+        Raises:
+            requests.RequestException: Steam API недоступен или вернул ошибку
+        """
         if not steam_ids:
             return {}
         
@@ -35,21 +48,16 @@ class SteamService:
             'steamids': ','.join(steam_ids)
         }
         
-        try:
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Преобразуем в словарь для быстрого доступа
-            result = {}
-            for player in data.get('response', {}).get('players', []):
-                result[player['steamid']] = player
-            
-            return result
-            
-        except requests.RequestException as e:
-            print(f"[STEAM API ERROR] Не удалось получить данные: {e}")
-            return {}
+        response = requests.get(url, params=params, timeout=5)
+        response.raise_for_status()
+        data = response.json()
+        
+        # Преобразуем в словарь для быстрого доступа
+        result = {}
+        for player in data.get('response', {}).get('players', []):
+            result[player['steamid']] = player
+        
+        return result
     
     def get_online_status(self, steam_id: str) -> Optional[str]:
         """
@@ -94,6 +102,31 @@ class SteamService:
         
         return result
     
+    def get_presences(self, steam_ids: List[str]) -> Dict[str, tuple]:
+        """
+        Статусы игроков для фонового опроса (до 100 ID за раз)
+        
+        В отличие от get_online_statuses ошибка Steam API не превращается в "НЕ В СЕТИ",
+        а пробрасывается - последние известные статусы не затираются.
+        
+        Returns:
+            Словарь {steam_id: (status, personastate, gameid)}; игроки, которых нет
+            в ответе Steam, получают "НЕ В СЕТИ"
+        
+        Raises:
+            requests.RequestException: Steam API недоступен или вернул ошибку
+        """
+        players = self.fetch_player_summaries(steam_ids)
+        
+        result = {}
+        for steam_id in steam_ids:
+            player = players.get(steam_id, {})
+            persona_state = player.get('personastate', 0)
+            game_id = player.get('gameid')
+            result[steam_id] = (self._map_persona_state(persona_state, game_id), persona_state, game_id)
+        
+        return result
+    
     def _map_persona_state(self, persona_state: int, game_id: Optional[str] = None) -> str:
         """
         Преобразовать personastate Steam API в наш формат
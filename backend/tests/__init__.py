@@ -0,0 +1 @@
+# Тесты backend (запуск из папки backend: python -m pytest)
@@ -0,0 +1,46 @@
+"""
+Общие фикстуры тестов
+
+Приложение с blueprint'ом api на базе TEST_DATABASE_URL (по умолчанию SQLite в памяти).
+Для SQLite JSONB создаётся как JSON; UUID-параметры передаются в обработчики
+объектами uuid, как их отдаёт модель.
+"""
+import os
+
+import pytest
+from flask import Flask
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+from models import db
+from tests.factories import ADMIN_STEAM_ID
+
+
+@compiles(JSONB, 'sqlite')
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return 'JSON'
+
+
+@pytest.fixture
+def app():
+    from routes import api
+    
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=os.getenv('TEST_DATABASE_URL', 'sqlite://'),
+        ADMIN_STEAM_IDS=[ADMIN_STEAM_ID]
+    )
+    db.init_app(app)
+    app.register_blueprint(api)
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,36 @@
+"""Создание игроков и кланов для тестов (в текущей сессии, с commit)"""
+from models import db, Clan, ClanMember, Player
+from services.clan_service import sync_clan_summary
+
+ADMIN_STEAM_ID = '76561190000000001'
+
+_player_seq = 0
+
+
+def make_player(steam_id=None, username=None):
+    global _player_seq
+    _player_seq += 1
+    player = Player(
+        steam_id=steam_id or f'7656119{_player_seq:010d}',
+        username=username or f'player{_player_seq}'
+    )
+    db.session.add(player)
+    db.session.flush()
+    return player
+
+
+def make_clan(tag, members=1):
+    """Клан с владельцем и members - 1 участниками"""
+    clan = Clan(name=f'Clan {tag}', tag=tag)
+    db.session.add(clan)
+    db.session.flush()
+    
+    for index in range(members):
+        player = make_player()
+        player.current_clan_id = clan.id
+        db.session.add(ClanMember(clan_id=clan.id, player_id=player.id, role='owner' if index == 0 else 'member'))
+    db.session.flush()
+    
+    sync_clan_summary(clan.id)
+    db.session.commit()
+    return clan
@@ -0,0 +1,39 @@
+"""Таблица лидеров не собирает снимок внутри запроса"""
+import numpy as np
+
+from services.leaderboard_service import LeaderboardSnapshot, leaderboard
+
+
+def test_leaderboard_warming_returns_503(client, monkeypatch):
+    started = []
+    monkeypatch.setattr(leaderboard, 'snapshot', None)
+    monkeypatch.setattr(leaderboard, 'warm_up', lambda: started.append(True))
+    monkeypatch.setattr(leaderboard, 'refresh', lambda: (_ for _ in ()).throw(AssertionError('refresh in request')))
+    
+    response = client.get('/api/stats/leaderboard?sortBy=kills')
+    
+    assert response.status_code == 503
+    assert response.get_json()['warming'] is True
+    assert response.headers['Retry-After']
+    assert started == [True]
+
+
+def test_leaderboard_served_from_snapshot(client, monkeypatch):
+    columns = {
+        'kills': np.array([5, 9], dtype=np.int64),
+        'deaths': np.array([1, 3], dtype=np.int64),
+        'kd': np.array([5.0, 3.0]),
+        'matches': np.array([2, 4], dtype=np.int64),
+        'wins': np.array([1, 2], dtype=np.int64),
+        'winRate': np.array([50.0, 50.0]),
+        'revives': np.array([0, 0], dtype=np.int64),
+        'playtime': np.array([10, 20], dtype=np.int64)
+    }
+    snapshot = LeaderboardSnapshot(['a', 'b'], ['A', 'B'], columns, 0.0)
+    monkeypatch.setattr(leaderboard, 'snapshot', snapshot)
+    monkeypatch.setattr(leaderboard.task, 'ensure_running', lambda: None)
+    
+    response = client.get('/api/stats/leaderboard?sortBy=kills')
+    
+    assert response.status_code == 200
+    assert [row['steamId'] for row in response.get_json()['leaderboard']] == ['b', 'a']
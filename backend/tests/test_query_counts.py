@@ -0,0 +1,121 @@
+"""Число SQL-запросов обработчиков кланов не зависит от числа кланов, составов и заявок"""
+import pytest
+from flask import request
+
+from models import db, ClanApplication, ClanInvitation, Player
+from routes import clans as clan_routes
+from services.query_counter import QueryBudgetExceeded, count_queries, query_budget
+from tests.factories import ADMIN_STEAM_ID, make_clan, make_player
+
+
+def test_clan_list_is_one_query(client):
+    for index in range(5):
+        make_clan(f'T{index}', members=index + 1)
+    db.session.remove()
+    
+    with count_queries() as counter:
+        response = client.get('/api/clans')
+    
+    assert response.status_code == 200
+    assert len(response.get_json()['clans']) == 5
+    assert counter.count == 1
+
+
+@pytest.mark.parametrize('members', [1, 50])
+def test_clan_detail_is_two_queries(app, members):
+    clan_id = make_clan('DET', members=members).id
+    db.session.remove()
+    
+    with app.test_request_context(), count_queries() as counter:
+        response, status = clan_routes.get_clan(clan_id)
+    
+    assert status == 200
+    assert len(response.get_json()['clan']['members']) == members
+    assert counter.count == 2
+
+
+@pytest.mark.parametrize('members', [1, 50])
+def test_clan_members_is_three_queries(app, members):
+    clan_id = make_clan('MEM', members=members).id
+    db.session.remove()
+    
+    with app.test_request_context(), count_queries() as counter:
+        response, status = clan_routes.get_clan_members(clan_id)
+    
+    assert status == 200
+    assert len(response.get_json()['members']) == members
+    # Клан, участники с игроками (JOIN), статусы из steam_presence
+    assert counter.count == 3
+
+
+@pytest.mark.parametrize('members', [1, 50])
+def test_admin_clans_query_count_is_fixed(app, members):
+    admin_id = make_player(steam_id=ADMIN_STEAM_ID).id
+    for index in range(3):
+        make_clan(f'ADM{index}', members=members)
+    db.session.remove()
+    
+    with app.test_request_context():
+        request.current_player = db.session.get(Player, admin_id)
+        # Без загрузки текущего игрока в require_auth (+1 запрос): страница кланов и их участники
+        with count_queries() as counter:
+            response, status = clan_routes.admin_get_all_clans.__wrapped__()
+    
+    assert status == 200
+    assert [len(clan['members']) for clan in response.get_json()['clans']] == [members] * 3
+    assert counter.count == 2
+
+
+def seed_listings(rows):
+    """Клан владельца с rows заявками и rows приглашениями; заявитель с заявками в rows кланов"""
+    clan = make_clan('OWN', members=1)
+    owner = db.session.get(Player, clan.owner_player_id)
+    applicant = make_player()
+    
+    for index in range(rows):
+        db.session.add(ClanApplication(clan_id=clan.id, player_id=make_player().id, message='hi'))
+        db.session.add(ClanInvitation(clan_id=clan.id, player_id=make_player().id, invited_by_id=owner.id))
+        other = make_clan(f'APP{index}', members=1)
+        db.session.add(ClanApplication(clan_id=other.id, player_id=applicant.id))
+        db.session.add(ClanInvitation(clan_id=other.id, player_id=applicant.id, invited_by_id=other.owner_player_id))
+    db.session.commit()
+    
+    ids = clan.id, owner.id, applicant.id
+    db.session.remove()
+    return ids
+
+
+def call_as(app, player_id, view, *args):
+    """Обработчик под require_auth с текущим игроком (без запроса require_auth)"""
+    with app.test_request_context():
+        request.current_player = db.session.get(Player, player_id)
+        with count_queries() as counter:
+            response, status = view.__wrapped__(*args)
+    assert status == 200
+    return response.get_json(), counter.count
+
+
+@pytest.mark.parametrize('rows', [1, 30])
+def test_listings_stay_within_budget(app, rows):
+    clan_id, owner_id, applicant_id = seed_listings(rows)
+    
+    for view, args, player_id, key in [
+        (clan_routes.get_clan_applications, (clan_id,), owner_id, 'applications'),
+        (clan_routes.get_clan_invitations, (clan_id,), owner_id, 'invitations'),
+        (clan_routes.get_my_applications, (), applicant_id, 'applications'),
+        (clan_routes.get_my_invitations, (), applicant_id, 'invitations')
+    ]:
+        data, count = call_as(app, player_id, view, *args)
+        assert len(data[key]) == rows
+        assert all(row['player'] and row['clan'] for row in data[key])
+        assert count <= view.__wrapped__.query_budget
+
+
+def test_budget_overrun_raises_in_tests(app):
+    @query_budget(1)
+    def two_queries():
+        db.session.execute(db.text('SELECT 1'))
+        db.session.execute(db.text('SELECT 2'))
+    
+    with app.test_request_context(), pytest.raises(QueryBudgetExceeded):
+        two_queries()
@@ -0,0 +1,54 @@
+"""Векторные K/D и винрейт снимка совпадают со скалярным путём"""
+import numpy as np
+import pytest
+
+from services.stats_service import STAT_COLUMNS, StatColumns, calculate_kd_ratio, win_rate
+
+
+def make_columns(rows):
+    values = np.array(
+        [[row.get(field, 0) for field in STAT_COLUMNS] for row in rows],
+        dtype=np.int64
+    ).reshape(-1, len(STAT_COLUMNS))
+    steam_ids = [str(index) for index in range(len(rows))]
+    return StatColumns(steam_ids, steam_ids, values, [None] * len(rows), np.zeros(len(rows)))
+
+
+@pytest.mark.parametrize('kills, deaths', [
+    (2212, 800),  # 2.765
+    (1001, 8),  # 125.125
+    (7, 8),  # 0.875
+    (3, 1),
+    (5, 0),
+    (0, 0)
+])
+def test_kd_matches_scalar(kills, deaths):
+    columns = make_columns([{'kills': kills, 'deaths': deaths}])
+    assert columns.kd.tolist() == [calculate_kd_ratio(kills, deaths)]
+
+
+@pytest.mark.parametrize('wins, matches', [
+    (1393, 2000),  # 69.65
+    (1, 8),  # 12.5
+    (3, 16),  # 18.75
+    (2, 3),
+    (0, 0)
+])
+def test_win_rate_matches_scalar(wins, matches):
+    columns = make_columns([{'wins': wins, 'matches': matches}])
+    assert columns.win_rate.tolist() == [win_rate(wins, matches)]
+
+
+def test_random_columns_match_scalar():
+    rng = np.random.default_rng(14)
+    kills = rng.integers(0, 5000, 20000)
+    deaths = rng.integers(0, 3000, 20000)
+    matches = rng.integers(0, 2000, 20000)
+    wins = (matches * rng.random(20000)).astype(np.int64)
+    columns = make_columns([
+        {'kills': k, 'deaths': d, 'matches': m, 'wins': w}
+        for k, d, m, w in zip(kills.tolist(), deaths.tolist(), matches.tolist(), wins.tolist())
+    ])
+    
+    assert columns.kd.tolist() == [calculate_kd_ratio(k, d) for k, d in zip(kills.tolist(), deaths.tolist())]
+    assert columns.win_rate.tolist() == [win_rate(w, m) for w, m in zip(wins.tolist(), matches.tolist())]
@@ -0,0 +1,84 @@
+"""Тип оружия детальной статистики (правила прежнего statsCalculations.js)"""
+import pytest
+
+from services.stats_service import KNIFE_WEAPONS, classify_weapon, decode_player_stats
+
+
+def detail_type(weapon_key):
+    return classify_weapon(weapon_key)[4][1]
+
+
+@pytest.mark.parametrize('weapon', sorted(KNIFE_WEAPONS))
+def test_bayonets_are_knives(weapon):
+    assert detail_type(f'BP_{weapon}') == 'knife'
+    assert detail_type(f'BP_Rifle_{weapon}') == 'knife'
+
+
+@pytest.mark.parametrize('weapon_key', [
+    'BP_SOCP_Knife',
+    'BP_Shovel_C',
+    'BP_Knife_M9'
+])
+def test_knives_and_shovels(weapon_key):
+    assert detail_type(weapon_key) == 'knife'
+
+
+@pytest.mark.parametrize('weapon_key', [
+    'BP_Mortarround_Heavy',
+    'BP_Heavy_Mortar',
+    'BP_Projectile_HE_120mm',
+    'BP_UBOP_Projectile_Mortar'
+])
+def test_artillery(weapon_key):
+    assert detail_type(weapon_key) == 'artillery'
+
+
+@pytest.mark.parametrize('weapon_key', [
+    'BP_BMP2_30mm_AP',
+    'BP_M2_Technical_Heavy'
+])
+def test_vehicle_takes_precedence(weapon_key):
+    assert detail_type(weapon_key) == 'vehicle'
+
+
+@pytest.mark.parametrize('weapon_key', [
+    'BP_M4_M68',
+    'BP_AK74M_Kobra',
+    'BP_Bayonet'
+])
+def test_infantry(weapon_key):
+    assert detail_type(weapon_key) == 'infantry'
+
+
+def test_bot_categories_unchanged():
+    # Штык в детальной статистике - нож, но topWeapons группирует как бот
+    weapon_name, _, is_artillery, is_knife, _ = classify_weapon('BP_AK74_AK74Bayonet')
+    assert (weapon_name, is_artillery, is_knife) == ('AK74', False, False)
+    
+    weapon_name, _, is_artillery, is_knife, _ = classify_weapon('BP_Projectile_HE_Mortar')
+    assert (weapon_name, is_artillery, is_knife) == ('Projectile_HE', True, False)
+
+
+def test_detailed_weapons_one_entry_per_key():
+    # Как в прежнем клиенте: запись на ключ, имя - последняя часть ключа
+    stats = decode_player_stats({
+        '_id': '76561190000000002',
+        'weapons': {
+            'BP_M4_M68': 30,
+            'BP_M4_ACOG': 20,
+            'BP_AK74_AK74Bayonet': 5,
+            'Shovel': 2,
+            'BP_Zero': 0
+        }
+    }).to_dict()
+    
+    assert stats['detailedWeapons'] == [
+        {'name': 'M68', 'type': 'infantry', 'kills': 30, 'fullName': 'BP_M4_M68'},
+        {'name': 'ACOG', 'type': 'infantry', 'kills': 20, 'fullName': 'BP_M4_ACOG'},
+        {'name': 'AK74Bayonet', 'type': 'knife', 'kills': 5, 'fullName': 'BP_AK74_AK74Bayonet'},
+        {'name': 'Shovel', 'type': 'knife', 'kills': 2, 'fullName': 'Shovel'}
+    ]
+    assert stats['topWeapon']['name'] == 'M68'
+    assert (stats['infantryKills'], stats['knifeKills']) == (50, 7)
+    # topWeapons группирует по второй части ключа, как бот
+    assert stats['topWeapons'][0] == {'name': 'M4', 'kills': 50}